@@ -7,16 +7,33 @@ to work, while the actual app code lives elsewhere in the repo.
 
 from __future__ import annotations
 
-import runpy
+import importlib.util
 import sys
 from pathlib import Path
 
 
 REAL_APP = Path(__file__).resolve().parents[1] / "vehicle-defect-mvp" / "app.py"
 REAL_APP_DIR = REAL_APP.parent
+REAL_APP_MODULE = "_vehicle_defect_mvp_real_app"
 
 # Ensure imports like `vehicle_defect_mvp.*` resolve the same way they would
 # when running the real app directly.
-sys.path.insert(0, str(REAL_APP_DIR))
+if str(REAL_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(REAL_APP_DIR))
 
-runpy.run_path(str(REAL_APP), run_name="__main__")
+# Streamlit re-executes this file on every rerun. Import the real app once per
+# process (module imports, cache registrations) and only call `render()` on
+# each rerun. It is registered under its own name so it can't collide with
+# this shim, which is also called `app`.
+_real_app = sys.modules.get(REAL_APP_MODULE)
+if _real_app is None:
+    _spec = importlib.util.spec_from_file_location(REAL_APP_MODULE, REAL_APP)
+    _real_app = importlib.util.module_from_spec(_spec)
+    sys.modules[REAL_APP_MODULE] = _real_app
+    try:
+        _spec.loader.exec_module(_real_app)
+    except BaseException:
+        sys.modules.pop(REAL_APP_MODULE, None)
+        raise
+
+_real_app.render()
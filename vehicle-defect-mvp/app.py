@@ -1,14 +1,22 @@
+import functools
+import hashlib
+import heapq
 import os
 import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
 from urllib.parse import quote_plus
 
+import numpy as np
+import orjson
 import pandas as pd
 import plotly.express as px
 import requests
 import streamlit as st
-import streamlit.components.v1 as components
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception_type, retry_if_result, stop_after_attempt, wait_exponential
 
 from vehicle_defect_mvp.cache import DiskCache
 from vehicle_defect_mvp.nhtsa import (
@@ -21,151 +29,245 @@ from vehicle_defect_mvp.analytics import (
     complaints_to_df,
     recalls_to_df,
     component_frequency,
+    component_row_index,
     severity_summary,
+    state_counts,
     complaints_time_series,
 )
 from vehicle_defect_mvp.enrich import enrich_complaints_df
 from vehicle_defect_mvp.text_search import build_index, search as search_index
 
 
-@st.cache_data(ttl=7 * 24 * 3600)
+# Popular makes listed first in the Make dropdown (in this order).
+_COMMON_MAKES = (
+    "Acura",
+    "Alfa Romeo",
+    "Audi",
+    "BMW",
+    "Buick",
+    "Cadillac",
+    "Chevrolet",
+    "Chrysler",
+    "Dodge",
+    "Fiat",
+    "Ford",
+    "Genesis",
+    "GMC",
+    "Honda",
+    "Hyundai",
+    "Infiniti",
+    "Jaguar",
+    "Jeep",
+    "Kia",
+    "Land Rover",
+    "Lexus",
+    "Lincoln",
+    "Mazda",
+    "Mercedes-Benz",
+    "Mini",
+    "Mitsubishi",
+    "Nissan",
+    "Polestar",
+    "Porsche",
+    "Ram",
+    "Rivian",
+    "Subaru",
+    "Tesla",
+    "Toyota",
+    "Volkswagen",
+    "Volvo",
+)
+_COMMON_MAKES_LOWER = tuple(m.lower() for m in _COMMON_MAKES)
+_COMMON_MAKES_LOWER_SET = frozenset(_COMMON_MAKES_LOWER)
+
+
+VPIC_TIMEOUT = (5, 20)  # (connect, read) seconds
+
+
+@retry(
+    retry=(
+        retry_if_exception_type(requests.RequestException)
+        | retry_if_result(lambda r: r.status_code in (500, 502, 503, 504))
+    ),
+    stop=stop_after_attempt(4),
+    wait=wait_exponential(multiplier=0.3, max=3),
+    # Out of retries on a 5xx: hand back the last response (the caller raises on it).
+    retry_error_callback=lambda state: state.outcome.result(),
+)
+def _vpic_get(url: str) -> requests.Response:
+    """GET for the vPIC dropdown helpers over the shared pooled Session, retrying transient 5xx."""
+    return _get_http_session().get(
+        url,
+        timeout=VPIC_TIMEOUT,
+        headers={"Accept": "application/json", "User-Agent": "vehicle-defect-mvp/1.0"},
+    )
+
+
+VPIC_TTL_SECONDS = 7 * 24 * 3600
+
+
+def _vpic_names(url: str, field: str) -> list[str]:
+    """
+    Sorted, de-duplicated, stripped `field` values from a vPIC call's `Results` rows.
+    Only the names are kept (getallmakes rows carry ids and other unused fields), and
+    they're persisted in the DiskCache so a restarted process (or another replica
+    sharing the cache dir) doesn't pay the vPIC round trip again; st.cache_data stays
+    the in-memory layer. Raises on network errors and non-200 responses, so neither
+    layer keeps a failed lookup (st.cache_data doesn't memoize exceptions).
+    """
+    cache = _get_cache()
+    key = f"{url}#{field}"
+    cached = cache.get(key, ttl_seconds=VPIC_TTL_SECONDS)
+    if cached is not None:
+        return cached
+
+    r = _vpic_get(url)
+    if r.status_code != 200:
+        raise NHTSAError(f"vPIC request failed ({r.status_code}): {url}")
+    rows = orjson.loads(r.content).get("Results") or []
+    names = sorted({(row.get(field) or "").strip() for row in rows} - {""})
+    cache.set(key, names)
+    return names
+
+
+@st.cache_data(ttl=VPIC_TTL_SECONDS, show_spinner=False)
 def vp_get_all_makes() -> list[str]:
-    try:
-        url = "https://vpic.nhtsa.dot.gov/api/vehicles/getallmakes?format=json"
-        r = requests.get(url, timeout=20)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        makes = [row.get("Make_Name", "").strip() for row in (data.get("Results") or [])]
-        makes = sorted({m for m in makes if m})
-
-        common = [
-            "Acura",
-            "Alfa Romeo",
-            "Audi",
-            "BMW",
-            "Buick",
-            "Cadillac",
-            "Chevrolet",
-            "Chrysler",
-            "Dodge",
-            "Fiat",
-            "Ford",
-            "Genesis",
-            "GMC",
-            "Honda",
-            "Hyundai",
-            "Infiniti",
-            "Jaguar",
-            "Jeep",
-            "Kia",
-            "Land Rover",
-            "Lexus",
-            "Lincoln",
-            "Mazda",
-            "Mercedes-Benz",
-            "Mini",
-            "Mitsubishi",
-            "Nissan",
-            "Polestar",
-            "Porsche",
-            "Ram",
-            "Rivian",
-            "Subaru",
-            "Tesla",
-            "Toyota",
-            "Volkswagen",
-            "Volvo",
-        ]
+    url = "https://vpic.nhtsa.dot.gov/api/vehicles/getallmakes?format=json"
+    makes = _vpic_names(url, "Make_Name")
 
-        makes_by_lower = {m.lower(): m for m in makes}
-        common_present = [makes_by_lower[c.lower()] for c in common if c.lower() in makes_by_lower]
+    # One pass: canonical spelling per lowercase name, and the non-common remainder.
+    makes_by_lower: dict[str, str] = {}
+    rest: list[str] = []
+    for m in makes:
+        ml = m.lower()
+        makes_by_lower[ml] = m
+        if ml not in _COMMON_MAKES_LOWER_SET:
+            rest.append(m)
 
-        common_set = {m.lower() for m in common_present}
-        rest = [m for m in makes if m.lower() not in common_set]
+    common_present = [makes_by_lower[c] for c in _COMMON_MAKES_LOWER if c in makes_by_lower]
 
-        return common_present + rest
-    except Exception:
-        return []
+    return common_present + rest
 
 
-@st.cache_data(ttl=7 * 24 * 3600)
+@st.cache_data(ttl=VPIC_TTL_SECONDS, show_spinner=False)
 def vp_get_models_for_make_year(make: str, year: int) -> list[str]:
-    try:
-        make_q = quote_plus(make.strip())
-        url = (
-            "https://vpic.nhtsa.dot.gov/api/vehicles/GetModelsForMakeYear/"
-            f"make/{make_q}/modelyear/{int(year)}?format=json"
-        )
-        r = requests.get(url, timeout=20)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        models = [row.get("Model_Name", "").strip() for row in (data.get("Results") or [])]
-        return sorted({m for m in models if m})
-    except Exception:
-        return []
+    make_q = quote_plus(make.strip())
+    url = (
+        "https://vpic.nhtsa.dot.gov/api/vehicles/GetModelsForMakeYear/"
+        f"make/{make_q}/modelyear/{int(year)}?format=json"
+    )
+    return _vpic_names(url, "Model_Name")
 
 
-@st.cache_data(ttl=7 * 24 * 3600)
+@st.cache_data(ttl=VPIC_TTL_SECONDS, show_spinner=False)
 def vp_get_models_for_make(make: str) -> list[str]:
     """
     vPIC's make+year model list can be incomplete for some makes/years.
     This broader endpoint helps users find valid model strings (e.g., hybrids/EVs).
     """
+    make_q = quote_plus(make.strip())
+    url = f"https://vpic.nhtsa.dot.gov/api/vehicles/GetModelsForMake/{make_q}?format=json"
+    return _vpic_names(url, "Model_Name")
+
+
+def _vpic_or_empty(fetch, *args) -> list[str]:
+    """
+    Call a vp_get_* helper, falling back to [] when vPIC fails. The failure isn't
+    memoized, so the next rerun asks vPIC again.
+    """
     try:
-        make_q = quote_plus(make.strip())
-        url = f"https://vpic.nhtsa.dot.gov/api/vehicles/GetModelsForMake/{make_q}?format=json"
-        r = requests.get(url, timeout=20)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        models = [row.get("Model_Name", "").strip() for row in (data.get("Results") or [])]
-        return sorted({m for m in models if m})
+        return fetch(*args)
     except Exception:
         return []
 
 
+@functools.lru_cache(maxsize=64)
+def _option_index_map(options: tuple) -> dict[str, int]:
+    """Selectbox option -> position, built once per distinct option list."""
+    return {opt: i for i, opt in enumerate(options)}
+
+
+_NORM_RE = re.compile(r"[^a-z0-9]+")
+_DIGIT_RE = re.compile(r"\d")
+_DIGIT_RUN_RE = re.compile(r"\d+")
+
+
+@functools.lru_cache(maxsize=8192)
 def _normalize(s: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "", (s or "").lower())
+    # Model names repeat heavily across candidate scoring runs.
+    return _NORM_RE.sub("", (s or "").lower())
+
+
+@st.cache_data(ttl=VPIC_TTL_SECONDS, show_spinner=False)
+def _candidate_pool(make: str, year: int) -> list[tuple[str, str, str, str]]:
+    """
+    vPIC models for a make/year prepared for scoring: (name, lowercased, normalized, first token).
+    Built once per (make, year) so repeated Analyze clicks only run the scoring pass.
+    Raises (so nothing is memoized) when vPIC fails or returns no models at all; a
+    transient outage must not pin "no fallback candidates" for the whole TTL.
+    """
+    # Some variants (e.g., hybrids) may not appear in the make+year list, so the
+    # make-wide list is needed too; the two vPIC calls are independent, fetch both at once.
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_year = ex.submit(vp_get_models_for_make_year, make, int(year))
+        f_all = ex.submit(vp_get_models_for_make, make)
+        models, models_all = f_year.result(), f_all.result()
+    if models_all:
+        models = sorted({*models, *models_all})
+    if not models:
+        raise NHTSAError(f"vPIC returned no models for {make} {year}.")
+
+    # Scores only depend on the lowercased name, so de-dup case variants up front,
+    # keeping the first in sorted order (what the old sort + seen-set picked).
+    by_lower: dict[str, str] = {}
+    for m in models:
+        by_lower.setdefault(m.lower(), m)
+
+    return [(m, ml, _normalize(m), (ml.split() or [""])[0]) for ml, m in by_lower.items()]
 
 
 def _candidate_models(make: str, model: str, year: int) -> list[str]:
     """
     NHTSA's `*ByVehicle` endpoints can be picky about exact model strings.
     If the chosen model returns no data, try a few close vPIC variants for the same make/year.
+    No candidates when vPIC is unavailable (retried on the next Analyze).
     """
     model = (model or "").strip()
     make = (make or "").strip()
     if not make or not model or not year:
         return []
-
-    models = vp_get_models_for_make_year(make, int(year))
-    # Some variants (e.g., hybrids) may not appear in the make+year list.
-    models_all = vp_get_models_for_make(make)
-    if models_all:
-        models = sorted({*models, *models_all})
-    if not models:
+    try:
+        return _rank_candidates(make, model, int(year))
+    except Exception:
         return []
 
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _rank_candidates(make: str, model: str, year: int) -> list[str]:
+    """
+    Scoring pass behind _candidate_models, memoized per vehicle so re-analyzing it
+    skips it. Raises (and isn't memoized) when the candidate pool can't be built.
+    """
+    pool = _candidate_pool(make, year)
+
     norm_model = _normalize(model)
     if not norm_model:
         return []
 
-    has_digits = bool(re.search(r"\d", model))
-    first_digit_match = re.search(r"\d", model)
+    first_digit_match = _DIGIT_RE.search(model)
+    has_digits = first_digit_match is not None
     first_digit = first_digit_match.group(0) if first_digit_match else ""
-    digit_run_match = re.search(r"\d+", model)
+    digit_run_match = _DIGIT_RUN_RE.search(model)
     digit_run = digit_run_match.group(0) if digit_run_match else ""
 
-    tok_model = (model.lower().split() or [""])[0]
+    model_lower = model.lower()
+    tok_model = (model_lower.split() or [""])[0]
 
     scored: list[tuple[int, str]] = []
-    for m in models:
-        if m.lower() == model.lower():
+    for m, ml, nm, tok_m in pool:
+        if ml == model_lower:
             continue
 
-        nm = _normalize(m)
         score = 0
 
         # General similarity (helps cases like "Accord" vs "Accord Hybrid")
@@ -176,7 +278,6 @@ def _candidate_models(make: str, model: str, year: int) -> list[str]:
         if nm in norm_model:
             score += 2
 
-        tok_m = (m.lower().split() or [""])[0]
         if tok_model and tok_m and tok_model == tok_m:
             score += 2
 
@@ -192,292 +293,138 @@ def _candidate_models(make: str, model: str, year: int) -> list[str]:
         if score > 0:
             scored.append((score, m))
 
-    scored.sort(key=lambda x: (-x[0], x[1]))
-
-    out: list[str] = []
-    seen = set()
-    for _, m in scored:
-        ml = m.lower()
-        if ml not in seen:
-            out.append(m)
-            seen.add(ml)
-        if len(out) >= 6:
-            break
-
-    return out
-
-
-st.set_page_config(
-    page_title="Vehicle Defect Assessment Tool",
-    layout="wide",
-)
-
-# Force horizontal scrollbar always visible on dataframes
-st.markdown(
-    """
-    <style>
-    /* ---- Streamlit DataFrame (Glide Data Grid) scrollbar always visible ---- */
-    div[data-testid="stDataFrame"] .gdg-scrollbar,
-    div[data-testid="stDataFrame"] .gdg-scrollbar-horizontal,
-    div[data-testid="stDataFrame"] .gdg-scrollbar-vertical,
-    div[data-testid*="stDataFrame"] [class*="gdg-scrollbar"] {
-        opacity: 1 !important;
-        transition: none !important;
-    }
-
-    div[data-testid="stDataFrame"] .gdg-scrollbar-horizontal,
-    div[data-testid*="stDataFrame"] [class*="gdg-scrollbar-horizontal"] {
-        height: 14px !important;
-    }
+    top = heapq.nsmallest(6, scored, key=lambda x: (-x[0], x[1]))
+    return [m for _, m in top]
 
-    div[data-testid="stDataFrame"] div[role="grid"],
-    div[data-testid*="stDataFrame"] div[role="grid"] {
-        overflow-x: auto !important;
-    }
 
-    /* Fallback (native scrollbars, if used by Streamlit version/browser) */
-    div[data-testid*="stDataFrame"] *::-webkit-scrollbar {
-        height: 14px;
-        width: 14px;
-    }
-    div[data-testid*="stDataFrame"] *::-webkit-scrollbar-thumb {
-        background: rgba(107, 114, 128, 0.55); /* gray-500-ish */
-        border-radius: 999px;
-    }
-    div[data-testid*="stDataFrame"] *::-webkit-scrollbar-track {
-        background: rgba(107, 114, 128, 0.15);
-    }
+DEFAULT_CACHE_DIR = os.environ.get("VDA_CACHE_DIR") or os.environ.get("SLP_CACHE_DIR", ".cache")
 
-    /* ---- Hide Streamlit header "link" (permalink) icons ---- */
-    .stHeadingAnchor,
-    .stMarkdownHeadingAnchor,
-    a.stMarkdownHeaderAnchor,
-    a.header-anchor,
-    h1 a[href^="#"],
-    h2 a[href^="#"],
-    h3 a[href^="#"],
-    h4 a[href^="#"],
-    h5 a[href^="#"],
-    h6 a[href^="#"] {
-        display: none !important;
-        visibility: hidden !important;
-        width: 0 !important;
-        height: 0 !important;
-    }
+ENRICH_LIMIT = int(os.environ.get("VDA_ENRICH_LIMIT") or os.environ.get("SLP_ENRICH_LIMIT", "120"))
+ENRICH_WORKERS = int(os.environ.get("VDA_ENRICH_WORKERS") or os.environ.get("SLP_ENRICH_WORKERS", "16"))
 
-    /* ---- Simple section headings (no anchor icons) ---- */
-    .vda-section-title {
-        font-size: 1.15rem;
-        font-weight: 600;
-        margin: 0 0 0.5rem 0;
-    }
 
-    /* ---- Sidebar footer (true bottom, theme-aware) ---- */
-    section[data-testid="stSidebar"] > div {
-        display: flex;
-        flex-direction: column;
-        height: 100%;
-    }
-    section[data-testid="stSidebar"] [data-testid="stSidebarContent"] {
-        display: flex;
-        flex-direction: column;
-        height: 100%;
-    }
-    section[data-testid="stSidebar"] .vda-sidebar-footer {
-        margin-top: auto;
-        padding: 0.75rem 0 0.5rem 0;
-        font-size: 0.85rem;
-        color: var(--text-color, rgba(107, 114, 128, 0.95));
-        opacity: 0.65;
-        border-top: 1px solid rgba(148, 163, 184, 0.35);
-        background: var(--secondary-background-color, transparent);
-    }
+@st.cache_resource(show_spinner=False)
+def _get_cache() -> DiskCache:
+    return DiskCache(DEFAULT_CACHE_DIR)
 
-    /* ---- Recalls table (always-visible horizontal scrollbar) ---- */
-    .vda-recalls-scroll {
-        overflow-x: auto;
-        overflow-y: hidden;
-        scrollbar-gutter: stable;
-        padding-bottom: 6px; /* keeps bar from feeling clipped */
-    }
-    .vda-recalls-scroll table {
-        border-collapse: collapse;
-        width: max-content;
-        min-width: 100%;
-    }
-    .vda-recalls-scroll th,
-    .vda-recalls-scroll td {
-        padding: 0.35rem 0.55rem;
-        border-bottom: 1px solid rgba(107, 114, 128, 0.25);
-        white-space: nowrap;
-        vertical-align: top;
-        font-size: 0.9rem;
-    }
-    .vda-recalls-scroll th {
-        font-weight: 600;
-        background: rgba(107, 114, 128, 0.08);
-        position: sticky;
-        top: 0;
-        z-index: 1;
-    }
-    .vda-recalls-scroll *::-webkit-scrollbar {
-        height: 14px;
-    }
-    .vda-recalls-scroll *::-webkit-scrollbar-thumb {
-        background: rgba(107, 114, 128, 0.55);
-        border-radius: 999px;
-    }
-    .vda-recalls-scroll *::-webkit-scrollbar-track {
-        background: rgba(107, 114, 128, 0.15);
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
 
-st.markdown(
+@st.cache_resource(show_spinner=False)
+def _get_http_session() -> requests.Session:
     """
-    <div style="
-        font-size: 2rem;
-        font-weight: 600;
-        margin-bottom: 0.5rem;
-    ">
-        Vehicle Defect Assessment Tool
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+    One pooled Session per process so NHTSA/vPIC calls reuse keep-alive connections.
+    Retries stay in tenacity at the call sites (`nhtsa._http_get_json`, `_vpic_get`),
+    so the adapter doesn't add its own.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, ENRICH_WORKERS * 2))
+    session.mount("https://", adapter)
+    return session
 
-DEFAULT_CACHE_DIR = os.environ.get("VDA_CACHE_DIR") or os.environ.get("SLP_CACHE_DIR", ".cache")
-cache = DiskCache(DEFAULT_CACHE_DIR)
 
 
-# --- Sidebar: vehicle selection ---
-with st.sidebar:
-    st.header("Vehicle input")
-    input_mode = st.radio("Lookup by", ["VIN", "Make / Model / Year"], horizontal=False)
+# Enrichment always on (no UI toggle)
+enrich = True
 
-    analyze_clicked = False
 
-    draft_vin = ""
-    draft_make = ""
-    draft_model = ""
-    draft_year: Optional[int] = None
+def _set_analysis_error(message: str, details: Optional[str] = None) -> None:
+    st.session_state["analysis_error"] = message
+    st.session_state["analysis_error_details"] = details
 
-    if input_mode == "VIN":
-        draft_vin = st.text_input(
-            "VIN (17 chars)",
-            value=st.session_state.get("draft_vin", ""),
-            placeholder="e.g., 1HGCV1F56MA123456",
-            key="draft_vin",
-        )
-        st.divider()
-        analyze_clicked = st.button("Analyze vehicle", type="primary")
-    else:
-        draft_year = st.number_input(
-            "Model year",
-            min_value=1950,
-            max_value=datetime.now().year + 1,
-            value=st.session_state.get("draft_year", 2021),
-            step=1,
-            key="draft_year",
-        )
+    # Clear data so we never fall back to stale results from prior runs.
+    st.session_state["analysis_recalls_df"] = pd.DataFrame()
+    st.session_state["analysis_complaints_df"] = pd.DataFrame()
+    st.session_state["analysis_enrich_stats"] = {"requested": 0, "enriched": 0, "failed": 0, "errors": 0}
+    st.session_state["analysis_raw_recalls"] = []
+    st.session_state["analysis_raw_complaints"] = []
+    st.session_state["analysis_search_index"] = None
+    _store_analysis_aggregates(pd.DataFrame())
 
-        makes = vp_get_all_makes()
 
-        draft_make = st.selectbox(
-            "Make",
-            options=[""] + makes,
-            index=0,
-            key="draft_make",
-        )
+ANALYSIS_AGGREGATE_KEYS = (
+    "analysis_severity",
+    "analysis_component_freq",
+    "analysis_time_series",
+    "analysis_component_rows",
+    "analysis_state_counts",
+    "analysis_text_col",
+)
 
-        # Reset model only when make changes (not when year changes)
-        prev_make = st.session_state.get("_prev_draft_make", "")
-        if draft_make != prev_make:
-            st.session_state["draft_model"] = ""
-            st.session_state["draft_model_manual"] = ""
-            st.session_state["_prev_draft_make"] = draft_make
-
-        include_all_models = bool(st.session_state.get("draft_model_include_all", False))
-
-        models: list[str] = []
-        if draft_make:
-            models = vp_get_models_for_make_year(draft_make, int(draft_year))
-            if include_all_models:
-                models = sorted({*models, *vp_get_models_for_make(draft_make)})
-
-        # Keep current model if still valid for this make+year; otherwise clear
-        current_model = st.session_state.get("draft_model", "")
-        if current_model and current_model not in models:
-            st.session_state["draft_model"] = ""
-
-        options = [""] + models
-        selected_model = st.session_state.get("draft_model", "")
-        model_index = options.index(selected_model) if selected_model in options else 0
-
-        manual_text_existing = (st.session_state.get("draft_model_manual") or "").strip()
-        if "draft_model_manual_enabled" not in st.session_state:
-            st.session_state["draft_model_manual_enabled"] = bool(manual_text_existing)
-
-        draft_model = st.selectbox(
-            "Model",
-            options=options,
-            index=model_index,
-            key="draft_model",
-            disabled=(not draft_make) or bool(manual_text_existing),
-        )
+# Preferred complaint text columns for Search, best first.
+SEARCH_TEXT_COLUMNS = ("description", "summary")
+# Distinct Search-tab queries whose ranked matches are memoized per session.
+SEARCH_RESULTS_MAX = 32
 
-        st.checkbox(
-            "Show more models (Hybrid/EV/variants)",
-            value=st.session_state.get("draft_model_include_all", False),
-            key="draft_model_include_all",
-            disabled=(not draft_make),
-            help="Adds extra model names that sometimes don't show up for the selected year.",
-        )
 
-        manual_enabled = st.checkbox(
-            "Model not listed? Enter model manually",
-            value=st.session_state.get("draft_model_manual_enabled", False),
-            key="draft_model_manual_enabled",
-            disabled=(not draft_make),
-        )
-        if manual_enabled or bool(manual_text_existing):
-            st.text_input(
-                "Model (manual override)",
-                value=st.session_state.get("draft_model_manual", ""),
-                key="draft_model_manual",
-                placeholder="e.g., Accord Hybrid",
-                help="If you type something here, it will be used when you click Analyze vehicle.",
-            )
-            if (st.session_state.get("draft_model_manual") or "").strip():
-                st.caption("Using manual model text for analysis. Clear it to re-enable the dropdown.")
+def _compute_analysis_aggregates(complaints_df: pd.DataFrame) -> dict:
+    """
+    Aggregates depend only on the analyzed complaints, so compute them once per
+    analysis instead of on every rerun (tab click, keystroke, selectbox change).
+    Keys are the session_state keys the results section reads.
+    """
+    return {
+        "analysis_severity": severity_summary(complaints_df),
+        "analysis_component_freq": component_frequency(complaints_df),
+        "analysis_time_series": complaints_time_series(complaints_df, date_col="dateComplaintFiled"),
+        "analysis_component_rows": component_row_index(complaints_df),
+        # Filled lazily by the Trends/Search tabs; reset with every analysis.
+        "analysis_component_ts": {},
+        "analysis_search_results": OrderedDict(),
+        "analysis_state_counts": state_counts(complaints_df),
+        # Searched/displayed text: full enriched description when present.
+        "analysis_text_col": next((c for c in SEARCH_TEXT_COLUMNS if c in complaints_df.columns), "summary"),
+    }
 
-        st.divider()
-        analyze_clicked = st.button("Analyze vehicle", type="primary")
 
-    st.markdown(
-        '<div class="vda-sidebar-footer">Made by Eric Gusdorf</div>',
-        unsafe_allow_html=True,
+def _store_analysis_aggregates(complaints_df: pd.DataFrame, aggregates: Optional[dict] = None) -> None:
+    """Store aggregates in session_state; pass `aggregates` when already computed (cached `_analyze`)."""
+    if aggregates is None:
+        aggregates = _compute_analysis_aggregates(complaints_df)
+    st.session_state.update(aggregates)
+
+
+# Figure builders are keyed on the (small) aggregated records they plot, so a
+# rerun that doesn't change the data reuses the already-built Plotly figure.
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _component_bar_figure(records: tuple):
+    top_n = pd.DataFrame(list(records), columns=["component", "count"])
+    fig = px.bar(
+        top_n,
+        x="count",
+        y="component",
+        orientation="h",
+        title="Top complaint components",
+    )
+    fig.update_layout(height=360, margin=dict(l=10, r=10, t=45, b=10))
+    return fig
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _state_choropleth_figure(records: tuple):
+    counts = pd.DataFrame(list(records), columns=["state", "count"])
+    # Color scale max straight from the plain records (no pandas reduction).
+    cmax = max((int(c) for _, c in records), default=0)
+    fig = px.choropleth(
+        counts,
+        locations="state",
+        locationmode="USA-states",
+        color="count",
+        scope="usa",
+        title="Complaints by state (from NHTSA consumer location)",
+        color_continuous_scale="Blues",
+        range_color=(0, cmax),
     )
 
-# Enrichment always on (no UI toggle)
-enrich = True
+    fig.update_geos(projection_type="albers usa", fitbounds=False)
+    fig.update_layout(height=500, margin=dict(l=10, r=10, t=50, b=10), dragmode=False)
+    return fig
 
-ENRICH_LIMIT = int(os.environ.get("VDA_ENRICH_LIMIT") or os.environ.get("SLP_ENRICH_LIMIT", "120"))
-ENRICH_WORKERS = int(os.environ.get("VDA_ENRICH_WORKERS") or os.environ.get("SLP_ENRICH_WORKERS", "6"))
 
-
-def _set_analysis_error(message: str, details: Optional[str] = None) -> None:
-    st.session_state["analysis_error"] = message
-    st.session_state["analysis_error_details"] = details
-
-    # Clear data so we never fall back to stale results from prior runs.
-    st.session_state["analysis_recalls_df"] = pd.DataFrame()
-    st.session_state["analysis_complaints_df"] = pd.DataFrame()
-    st.session_state["analysis_enrich_stats"] = {"requested": 0, "enriched": 0, "failed": 0}
-    st.session_state["analysis_raw_recalls"] = []
-    st.session_state["analysis_raw_complaints"] = []
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _trend_line_figure(records: tuple, title: str):
+    ts = pd.DataFrame(list(records), columns=["month", "count"])
+    fig = px.line(ts, x="month", y="count", markers=True, title=title)
+    fig.update_layout(height=380, margin=dict(l=10, r=10, t=50, b=10))
+    return fig
 
 
 def _clear_analysis_error() -> None:
@@ -485,8 +432,10 @@ def _clear_analysis_error() -> None:
     st.session_state["analysis_error_details"] = None
 
 
+@st.cache_data(ttl=24 * 3600, show_spinner=False)
 def _vehicle_from_vin(vin: str):
-    decoded = decode_vin(vin, cache=cache)
+    # Decoding is deterministic per VIN; re-analyzing the same VIN skips the round trip.
+    decoded = decode_vin(vin, cache=_get_cache(), session=_get_http_session())
     make_ = (decoded.get("Make") or "").strip()
     model_ = (decoded.get("Model") or "").strip()
     year_ = (decoded.get("ModelYear") or "").strip()
@@ -494,15 +443,390 @@ def _vehicle_from_vin(vin: str):
     return make_, model_, int(year_) if str(year_).isdigit() else None, decoded, warn
 
 
-def _best_text_column(df: pd.DataFrame) -> str:
-    for col in ["description", "summary"]:
-        if col in df.columns:
-            return col
-    return "summary"
+def _fetch_vehicle_data(
+    make: str,
+    model: str,
+    year: int,
+    cache: DiskCache,
+    http: requests.Session,
+):
+    """
+    Fetch recalls and complaints concurrently (independent endpoints).
+    Errors are captured per endpoint so one failing doesn't hide the other.
+    """
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        recalls_fut = ex.submit(fetch_recalls_by_vehicle, make, model, year, cache=cache, session=http)
+        complaints_fut = ex.submit(fetch_complaints_by_vehicle, make, model, year, cache=cache, session=http)
+
+    recalls: list[dict] = []
+    complaints: list[dict] = []
+    recalls_err: Optional[str] = None
+    complaints_err: Optional[str] = None
 
+    try:
+        recalls = recalls_fut.result()
+    except NHTSAError as e:
+        recalls_err = str(e)
 
-# --- Run analysis ---
-if analyze_clicked:
+    try:
+        complaints = complaints_fut.result()
+    except NHTSAError as e:
+        complaints_err = str(e)
+
+    return recalls, complaints, recalls_err, complaints_err
+
+
+def _fetch_with_fallback(make: str, models: list[str], year: int):
+    """
+    Fetch the model as entered first (the common case). If it returns nothing, fetch
+    all fallback candidates concurrently and take the first one with data, in
+    priority order. Returns (used_model, recalls, complaints, recalls_err, complaints_err);
+    when no candidate has data, the last candidate's (empty/error) result is returned.
+    """
+    cache = _get_cache()
+    http = _get_http_session()
+
+    first, fallbacks = models[0], models[1:]
+    recalls, complaints, recalls_err, complaints_err = _fetch_vehicle_data(make, first, year, cache, http)
+    if recalls or complaints or not fallbacks:
+        return first, recalls, complaints, recalls_err, complaints_err
+
+    with ThreadPoolExecutor(max_workers=min(len(fallbacks), 4)) as ex:
+        futs = [ex.submit(_fetch_vehicle_data, make, m, year, cache, http) for m in fallbacks]
+        for m, fut in zip(fallbacks, futs):
+            recalls, complaints, recalls_err, complaints_err = fut.result()
+            if recalls or complaints:
+                # Lower-priority candidates that haven't started are no longer needed.
+                for other in futs:
+                    other.cancel()
+                return m, recalls, complaints, recalls_err, complaints_err
+
+    return fallbacks[-1], recalls, complaints, recalls_err, complaints_err
+
+
+class _PartialAnalysis(Exception):
+    """Raised out of `_analyze` so a result with errored enrichment lookups isn't cached."""
+
+    def __init__(self, result: dict):
+        super().__init__("complaint enrichment incomplete")
+        self.result = result
+
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=32)
+def _analyze(
+    make: str,
+    model: str,
+    year: int,
+    recalls_ok: bool,
+    complaints_ok: bool,
+    _recalls: list[dict],
+    _complaints: list[dict],
+):
+    """
+    DataFrame conversion, enrichment and the results-section aggregates (severity,
+    component frequency, time series, component rows, state counts) for one fetched
+    vehicle, memoized on the vehicle.
+    The raw payloads (underscore args) aren't hashed: for a given vehicle they come from
+    the same 12h-cached NHTSA responses. The endpoint-success flags are part of the key
+    so a failed fetch endpoint doesn't pin an incomplete result for the whole TTL. Enrichment
+    lookups that raised (enrich_stats["errors"]) raise _PartialAnalysis instead of returning,
+    so the next Analyze retries them; lookups that succeeded, including empty payloads,
+    come from the DiskCache and don't block memoization.
+    """
+    recalls_df = recalls_to_df(_recalls)
+    complaints_df = complaints_to_df(_complaints)
+
+    enrich_stats = {"requested": 0, "enriched": 0, "failed": 0, "errors": 0}
+    if not complaints_df.empty:
+        complaints_df, enrich_stats = enrich_complaints_df(
+            complaints_df,
+            cache=_get_cache(),
+            max_records=int(ENRICH_LIMIT),
+            max_workers=int(ENRICH_WORKERS),
+            session=_get_http_session(),
+        )
+
+    result = {
+        "recalls_df": recalls_df,
+        "complaints_df": complaints_df,
+        "enrich_stats": enrich_stats,
+        "aggregates": _compute_analysis_aggregates(complaints_df),
+    }
+    if enrich_stats.get("errors"):
+        raise _PartialAnalysis(result)
+    return result
+
+
+def _build_search_index(complaints_df: pd.DataFrame, text_col: str):
+    """
+    Build the symptom search index once per analysis (not per Search-tab rerun).
+    Returns None when there is no searchable text.
+    """
+    if complaints_df is None or complaints_df.empty:
+        return None
+    if text_col not in complaints_df.columns:
+        return None
+    col = complaints_df[text_col]
+    digest = hashlib.blake2b(
+        pd.util.hash_pandas_object(col, index=False).to_numpy().tobytes(), digest_size=16
+    ).hexdigest()
+    # One object-array copy with NaN already blanked (build_index makes its own list).
+    return _get_index(digest, col.to_numpy(dtype=object, na_value=""))
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _get_index(digest: str, _texts):
+    """
+    Search index shared by content digest (the texts themselves aren't hashed), so
+    re-analyzing a vehicle or another session with the same complaints reuses it.
+    The index is only read by `search_index`, so sharing it is safe.
+    """
+    try:
+        return build_index(_texts)
+    except ValueError:
+        # e.g. empty vocabulary (all texts blank or stop words)
+        return None
+
+
+
+# Page-level CSS/HTML, built once at import. Streamlit drops elements a run doesn't
+# re-emit, so these are still written every run, just never rebuilt.
+# The CSS forces the horizontal scrollbar to stay visible on dataframes.
+_APP_CSS = """
+<style>
+/* ---- Streamlit DataFrame (Glide Data Grid) scrollbar always visible ---- */
+div[data-testid="stDataFrame"] .gdg-scrollbar,
+div[data-testid="stDataFrame"] .gdg-scrollbar-horizontal,
+div[data-testid="stDataFrame"] .gdg-scrollbar-vertical,
+div[data-testid*="stDataFrame"] [class*="gdg-scrollbar"] {
+    opacity: 1 !important;
+    transition: none !important;
+}
+
+div[data-testid="stDataFrame"] .gdg-scrollbar-horizontal,
+div[data-testid*="stDataFrame"] [class*="gdg-scrollbar-horizontal"] {
+    height: 14px !important;
+}
+
+div[data-testid="stDataFrame"] div[role="grid"],
+div[data-testid*="stDataFrame"] div[role="grid"] {
+    overflow-x: auto !important;
+}
+
+/* Fallback (native scrollbars, if used by Streamlit version/browser) */
+div[data-testid*="stDataFrame"] *::-webkit-scrollbar {
+    height: 14px;
+    width: 14px;
+}
+div[data-testid*="stDataFrame"] *::-webkit-scrollbar-thumb {
+    background: rgba(107, 114, 128, 0.55); /* gray-500-ish */
+    border-radius: 999px;
+}
+div[data-testid*="stDataFrame"] *::-webkit-scrollbar-track {
+    background: rgba(107, 114, 128, 0.15);
+}
+
+/* ---- Hide Streamlit header "link" (permalink) icons ---- */
+.stHeadingAnchor,
+.stMarkdownHeadingAnchor,
+a.stMarkdownHeaderAnchor,
+a.header-anchor,
+h1 a[href^="#"],
+h2 a[href^="#"],
+h3 a[href^="#"],
+h4 a[href^="#"],
+h5 a[href^="#"],
+h6 a[href^="#"] {
+    display: none !important;
+    visibility: hidden !important;
+    width: 0 !important;
+    height: 0 !important;
+}
+
+/* ---- Simple section headings (no anchor icons) ---- */
+.vda-section-title {
+    font-size: 1.15rem;
+    font-weight: 600;
+    margin: 0 0 0.5rem 0;
+}
+
+/* ---- Sidebar footer (true bottom, theme-aware) ---- */
+section[data-testid="stSidebar"] > div {
+    display: flex;
+    flex-direction: column;
+    height: 100%;
+}
+section[data-testid="stSidebar"] [data-testid="stSidebarContent"] {
+    display: flex;
+    flex-direction: column;
+    height: 100%;
+}
+section[data-testid="stSidebar"] .vda-sidebar-footer {
+    margin-top: auto;
+    padding: 0.75rem 0 0.5rem 0;
+    font-size: 0.85rem;
+    color: var(--text-color, rgba(107, 114, 128, 0.95));
+    opacity: 0.65;
+    border-top: 1px solid rgba(148, 163, 184, 0.35);
+    background: var(--secondary-background-color, transparent);
+}
+
+</style>
+"""
+
+_APP_TITLE_HTML = """
+<div style="
+    font-size: 2rem;
+    font-weight: 600;
+    margin-bottom: 0.5rem;
+">
+    Vehicle Defect Assessment Tool
+</div>
+"""
+
+
+def _render_header() -> None:
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
+    st.markdown(_APP_TITLE_HTML, unsafe_allow_html=True)
+
+
+def _render_sidebar():
+    """Draw the vehicle-input sidebar; returns the draft selection and whether Analyze was clicked."""
+    # --- Sidebar: vehicle selection ---
+    with st.sidebar:
+        st.header("Vehicle input")
+        input_mode = st.radio("Lookup by", ["VIN", "Make / Model / Year"], horizontal=False)
+
+        analyze_clicked = False
+
+        draft_vin = ""
+        draft_make = ""
+        draft_model = ""
+        draft_year: Optional[int] = None
+
+        if input_mode == "VIN":
+            draft_vin = st.text_input(
+                "VIN (17 chars)",
+                value=st.session_state.get("draft_vin", ""),
+                placeholder="e.g., 1HGCV1F56MA123456",
+                key="draft_vin",
+            )
+            st.divider()
+            analyze_clicked = st.button("Analyze vehicle", type="primary")
+        else:
+            draft_year = st.number_input(
+                "Model year",
+                min_value=1950,
+                max_value=datetime.now().year + 1,
+                value=st.session_state.get("draft_year", 2021),
+                step=1,
+                key="draft_year",
+            )
+
+            makes = _vpic_or_empty(vp_get_all_makes)
+
+            draft_make = st.selectbox(
+                "Make",
+                options=[""] + makes,
+                index=0,
+                key="draft_make",
+            )
+
+            # Reset model only when make changes (not when year changes)
+            prev_make = st.session_state.get("_prev_draft_make", "")
+            if draft_make != prev_make:
+                st.session_state["draft_model"] = ""
+                st.session_state["draft_model_manual"] = ""
+                st.session_state["_prev_draft_make"] = draft_make
+
+            include_all_models = bool(st.session_state.get("draft_model_include_all", False))
+
+            models: list[str] = []
+            if draft_make:
+                models = _vpic_or_empty(vp_get_models_for_make_year, draft_make, int(draft_year))
+                if include_all_models:
+                    models = sorted({*models, *_vpic_or_empty(vp_get_models_for_make, draft_make)})
+
+            # Keep current model if still valid for this make+year; otherwise clear
+            current_model = st.session_state.get("draft_model", "")
+            if current_model and current_model not in models:
+                st.session_state["draft_model"] = ""
+
+            options = [""] + models
+            selected_model = st.session_state.get("draft_model", "")
+            model_index = _option_index_map(tuple(options)).get(selected_model, 0)
+
+            manual_text_existing = (st.session_state.get("draft_model_manual") or "").strip()
+            if "draft_model_manual_enabled" not in st.session_state:
+                st.session_state["draft_model_manual_enabled"] = bool(manual_text_existing)
+
+            draft_model = st.selectbox(
+                "Model",
+                options=options,
+                index=model_index,
+                key="draft_model",
+                disabled=(not draft_make) or bool(manual_text_existing),
+            )
+
+            st.checkbox(
+                "Show more models (Hybrid/EV/variants)",
+                value=st.session_state.get("draft_model_include_all", False),
+                key="draft_model_include_all",
+                disabled=(not draft_make),
+                help="Adds extra model names that sometimes don't show up for the selected year.",
+            )
+
+            manual_enabled = st.checkbox(
+                "Model not listed? Enter model manually",
+                value=st.session_state.get("draft_model_manual_enabled", False),
+                key="draft_model_manual_enabled",
+                disabled=(not draft_make),
+            )
+            if manual_enabled or bool(manual_text_existing):
+                st.text_input(
+                    "Model (manual override)",
+                    value=st.session_state.get("draft_model_manual", ""),
+                    key="draft_model_manual",
+                    placeholder="e.g., Accord Hybrid",
+                    help="If you type something here, it will be used when you click Analyze vehicle.",
+                )
+                if (st.session_state.get("draft_model_manual") or "").strip():
+                    st.caption("Using manual model text for analysis. Clear it to re-enable the dropdown.")
+
+            st.divider()
+            analyze_clicked = st.button("Analyze vehicle", type="primary")
+
+        st.markdown(
+            '<div class="vda-sidebar-footer">Made by Eric Gusdorf</div>',
+            unsafe_allow_html=True,
+        )
+
+    return input_mode, draft_vin, draft_make, draft_model, draft_year, analyze_clicked
+
+
+def _stop_analysis() -> None:
+    """
+    st.stop() for _run_analysis. Clears the re-entrancy flag first: once a stop has
+    been requested, session_state writes (e.g. from a `finally`) are discarded.
+    """
+    st.session_state["_analyze_running"] = False
+    st.stop()
+
+
+def _run_analysis(
+    input_mode: str,
+    draft_vin: str,
+    draft_make: str,
+    draft_model: str,
+    draft_year: Optional[int],
+) -> None:
+    """Fetch, enrich and aggregate data for the drafted vehicle into session_state."""
+    # Re-entrancy guard (purely defensive: Streamlit runs one script at a time per
+    # session): an Analyze still fetching/enriching must not start a second thread pool.
+    # Cleared in `finally`, and by _stop_analysis before every early exit below.
+    if st.session_state.get("_analyze_running"):
+        st.stop()
+    st.session_state["_analyze_running"] = True
     try:
         _clear_analysis_error()
 
@@ -510,7 +834,7 @@ if analyze_clicked:
             if not draft_vin:
                 _set_analysis_error("Enter a VIN.")
                 st.error(st.session_state["analysis_error"])
-                st.stop()
+                _stop_analysis()
 
             make_, model_, year_, decoded, warn = _vehicle_from_vin(draft_vin)
             if warn:
@@ -525,7 +849,7 @@ if analyze_clicked:
                 }
                 _set_analysis_error("Could not decode make/model/year from VIN. Try Make/Model/Year input.")
                 st.error(st.session_state["analysis_error"])
-                st.stop()
+                _stop_analysis()
 
             st.session_state["analysis_vehicle"] = {
                 "make": make_,
@@ -551,7 +875,7 @@ if analyze_clicked:
                 }
                 _set_analysis_error("Enter make, model, and year.")
                 st.error(st.session_state["analysis_error"])
-                st.stop()
+                _stop_analysis()
 
             st.session_state["analysis_vehicle"] = {
                 "make": draft_make,
@@ -565,37 +889,14 @@ if analyze_clicked:
 
         # Fetch with fallback model tries
         with st.spinner("Fetching NHTSA recalls + complaints..."):
-            recalls: list[dict] = []
-            complaints: list[dict] = []
-            recalls_err: Optional[str] = None
-            complaints_err: Optional[str] = None
-
             tried_models = [v["model"]]
             for m in _candidate_models(v["make"], v["model"], v["year"]):
                 if m not in tried_models:
                     tried_models.append(m)
 
-            used_model = v["model"]
-
-            for m in tried_models:
-                used_model = m
-                recalls_err = None
-                complaints_err = None
-
-                try:
-                    recalls = fetch_recalls_by_vehicle(v["make"], m, v["year"], cache=cache)
-                except NHTSAError as e:
-                    recalls_err = str(e)
-                    recalls = []
-
-                try:
-                    complaints = fetch_complaints_by_vehicle(v["make"], m, v["year"], cache=cache)
-                except NHTSAError as e:
-                    complaints_err = str(e)
-                    complaints = []
-
-                if recalls or complaints:
-                    break
+            used_model, recalls, complaints, recalls_err, complaints_err = _fetch_with_fallback(
+                v["make"], tried_models, v["year"]
+            )
 
         # Both endpoints failed => service issue
         if recalls_err and complaints_err:
@@ -605,7 +906,7 @@ if analyze_clicked:
                 details=f"recalls error:\n{recalls_err}\n\ncomplaints error:\n{complaints_err}",
             )
             st.error(st.session_state["analysis_error"])
-            st.stop()
+            _stop_analysis()
 
         # If fallback found results, update model and inform user (blue)
         if (used_model != v["model"]) and (recalls or complaints):
@@ -621,7 +922,7 @@ if analyze_clicked:
                 "Verify the make, model, and year."
             )
             st.error(st.session_state["analysis_error"])
-            st.stop()
+            _stop_analysis()
 
         # Partial failures (keep blue)
         if recalls_err and not complaints_err:
@@ -632,432 +933,311 @@ if analyze_clicked:
         st.session_state["analysis_raw_recalls"] = recalls
         st.session_state["analysis_raw_complaints"] = complaints
 
-        recalls_df = recalls_to_df(recalls)
-        complaints_df = complaints_to_df(complaints)
-
-        enrich_stats = {"requested": 0, "enriched": 0, "failed": 0}
-        if not complaints_df.empty:
-            with st.spinner("Enriching complaints (location + full text)..."):
-                complaints_df, enrich_stats = enrich_complaints_df(
-                    complaints_df,
-                    cache=cache,
-                    max_records=int(ENRICH_LIMIT),
-                    max_workers=int(ENRICH_WORKERS),
+        with st.spinner("Enriching complaints (location + full text)..."):
+            try:
+                result = _analyze(
+                    v["make"],
+                    v["model"],
+                    v["year"],
+                    recalls_err is None,
+                    complaints_err is None,
+                    _recalls=recalls,
+                    _complaints=complaints,
                 )
+            except _PartialAnalysis as e:
+                result = e.result
+
+        recalls_df = result["recalls_df"]
+        complaints_df = result["complaints_df"]
+        enrich_stats = result["enrich_stats"]
 
         st.session_state["analysis_recalls_df"] = recalls_df
         st.session_state["analysis_complaints_df"] = complaints_df
         st.session_state["analysis_enrich_stats"] = enrich_stats
+        _store_analysis_aggregates(complaints_df, result["aggregates"])
+        st.session_state["analysis_search_index"] = _build_search_index(
+            complaints_df, st.session_state["analysis_text_col"]
+        )
 
     except NHTSAError as e:
         _set_analysis_error(str(e))
         st.error(st.session_state["analysis_error"])
-        st.stop()
+        _stop_analysis()
     except Exception:
         # Avoid showing redacted stack traces to end users
         _set_analysis_error("Unexpected error. Please try again.")
         st.error(st.session_state["analysis_error"])
-        st.stop()
-
-
-# --- Display results if available ---
-# Back-compat: if older keys exist (from prior session) but new ones don't, reuse them.
-if ("analysis_vehicle" not in st.session_state) and ("vehicle" in st.session_state):
-    st.session_state["analysis_vehicle"] = st.session_state["vehicle"]
-    st.session_state["analysis_recalls_df"] = st.session_state.get("recalls_df", pd.DataFrame())
-    st.session_state["analysis_complaints_df"] = st.session_state.get("complaints_df", pd.DataFrame())
-    st.session_state["analysis_enrich_stats"] = st.session_state.get(
-        "enrich_stats", {"requested": 0, "enriched": 0, "failed": 0}
-    )
-    st.session_state["analysis_raw_recalls"] = st.session_state.get("raw_recalls", [])
-    st.session_state["analysis_raw_complaints"] = st.session_state.get("raw_complaints", [])
-
-if "analysis_vehicle" in st.session_state:
-    v = st.session_state["analysis_vehicle"]
-    recalls_df = st.session_state.get("analysis_recalls_df", pd.DataFrame())
-    complaints_df = st.session_state.get("analysis_complaints_df", pd.DataFrame())
-    enrich_stats = st.session_state.get(
-        "analysis_enrich_stats", {"requested": 0, "enriched": 0, "failed": 0}
-    )
-
-    analysis_error = st.session_state.get("analysis_error")
-    analysis_error_details = st.session_state.get("analysis_error_details")
-    if analysis_error:
-        st.error(analysis_error)
-        if analysis_error_details:
-            with st.expander("Details"):
-                st.code(analysis_error_details)
-        st.stop()
-
-    st.markdown(
-        f"""
-        <div style="font-size:1.4rem; font-weight:600; margin-bottom:0.5rem;">
-            {v['year']} 
-            <span style="color:#6b7280; font-weight:500;">
-                {v['make']} {v['model']}
-            </span>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-    if v.get("vin"):
-        st.caption(f"VIN: `{v['vin']}`")
-
-    sev = severity_summary(complaints_df)
-    k1, k2, k3, k4, k5, k6 = st.columns(6)
-    k1.metric("Complaints", f"{len(complaints_df):,}")
-    k2.metric("Recalls", f"{len(recalls_df):,}")
-    k3.metric("Crashes", f"{sev['crash']:,}")
-    k4.metric("Fires", f"{sev['fire']:,}")
-    k5.metric("Injuries", f"{sev['injuries']:,}")
-    k6.metric("Deaths", f"{sev['deaths']:,}")
-
-    tabs = st.tabs(["Summary", "Search", "Map", "Trends"])
-
-    # --- Summary ---
-    with tabs[0]:
-        left, right = st.columns([1, 1])
-        with left:
-            st.markdown('<div class="vda-section-title">Defect patterns</div>', unsafe_allow_html=True)
-            comp_df = component_frequency(complaints_df)
-            if comp_df.empty:
-                st.info("No complaint component labels returned for this vehicle.")
-            else:
-                top_n = comp_df.head(10)
-
-                fig = px.bar(
-                    top_n,
-                    x="count",
-                    y="component",
-                    orientation="h",
-                    title="Top complaint components",
-                )
-                fig.update_layout(height=360, margin=dict(l=10, r=10, t=45, b=10))
-                st.plotly_chart(fig, use_container_width=True)
-
-                display_df = top_n[["component", "count", "share"]].copy()
-                display_df = display_df.rename(
-                    columns={
-                        "component": "Component",
-                        "count": "Complaint Count",
-                        "share": "Share of Total Complaints (%)",
-                    }
-                )
-                display_df["Share of Total Complaints (%)"] = (
-                    display_df["Share of Total Complaints (%)"] * 100
-                ).round(1)
-
-                st.dataframe(display_df, use_container_width=True, hide_index=True)
-
-        with right:
-            st.markdown('<div class="vda-section-title">Recalls</div>', unsafe_allow_html=True)
-            if recalls_df is None or recalls_df.empty:
-                st.info("No recalls returned by NHTSA.")
-            else:
-                cols = [
-                    c
-                    for c in ["NHTSACampaignNumber", "ReportReceivedDate", "Component", "Summary"]
-                    if c in recalls_df.columns
-                ]
+        _stop_analysis()
+    finally:
+        st.session_state["_analyze_running"] = False
 
-                recalls_display = recalls_df[cols].copy()
-
-                if "ReportReceivedDate" in recalls_display.columns:
-                    recalls_display["ReportReceivedDate"] = (
-                        pd.to_datetime(recalls_display["ReportReceivedDate"], errors="coerce").dt.strftime("%m/%d/%Y")
-                    )
-
-                recalls_html = recalls_display.head(50).to_html(index=False, escape=True)
-                components.html(
-                    f"""
-                    <div id="vda-recalls-container" style="width: 100%;">
-                      <style>
-                        :root {{
-                          --track: rgba(96, 165, 250, 0.22);        /* lighter blue */
-                          --thumb: rgba(96, 165, 250, 0.70);
-                          --thumb-hover: rgba(59, 130, 246, 0.90);
-                          --border: rgba(96, 165, 250, 0.30);
-                          --header: rgb(191, 219, 254);            /* slightly darker header */
-                          --cell: rgb(239, 246, 255);              /* solid, lighter body cells */
-                          --row-alt: rgb(219, 234, 254);           /* subtle solid striping */
-                          --text: rgba(30, 64, 175, 1);             /* blue-800-ish */
-                          --text-muted: rgba(29, 78, 216, 0.95);     /* blue-700-ish */
-                        }}
-
-                        #vda-recalls-scroll {{
-                          overflow-x: scroll;   /* force scroll container */
-                          overflow-y: auto;     /* allow vertical scrolling when many rows */
-                          max-height: 360px;    /* prevents iframe cropping */
-                          width: 100%;
-                          scrollbar-width: none; /* hide native scrollbar (Firefox) */
-                        }}
-                        #vda-recalls-scroll::-webkit-scrollbar {{
-                          height: 0px;          /* hide native scrollbar (WebKit) */
-                        }}
-
-                        #vda-recalls-scroll table {{
-                          border-collapse: collapse;
-                          width: max-content;
-                          min-width: 100%;
-                          font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif;
-                          font-size: 0.9rem;
-                        }}
-                        #vda-recalls-scroll th,
-                        #vda-recalls-scroll td {{
-                          padding: 0.35rem 0.55rem;
-                          border-bottom: 1px solid var(--border);
-                          white-space: nowrap;
-                          vertical-align: top;
-                          text-align: left;
-                          color: var(--text);
-                          background: var(--cell);
-                        }}
-                        #vda-recalls-scroll th {{
-                          font-weight: 600;
-                          background: var(--header) !important;
-                          position: sticky;
-                          top: 0;
-                          z-index: 1;
-                          color: var(--text-muted);
-                        }}
-                        #vda-recalls-scroll tbody tr:nth-child(even) td {{
-                          background: var(--row-alt);
-                        }}
-
-                        /* Always-visible custom scrollbar */
-                        #vda-recalls-bar {{
-                          height: 14px;
-                          background: var(--track);
-                          border-radius: 999px;
-                          margin-top: 6px;
-                          position: relative;
-                          user-select: none;
-                          touch-action: none;
-                        }}
-                        #vda-recalls-thumb {{
-                          height: 14px;
-                          background: var(--thumb);
-                          border-radius: 999px;
-                          width: 40px;
-                          transform: translateX(0px);
-                          position: absolute;
-                          left: 0;
-                          top: 0;
-                          cursor: pointer;
-                        }}
-                        #vda-recalls-thumb:hover {{
-                          background: var(--thumb-hover);
-                        }}
-                      </style>
-
-                      <div id="vda-recalls-scroll">{recalls_html}</div>
-                      <div id="vda-recalls-bar" aria-label="Horizontal scroll bar">
-                        <div id="vda-recalls-thumb" aria-label="Scroll thumb"></div>
-                      </div>
-                    </div>
-
-                    <script>
-                      const scrollEl = document.getElementById("vda-recalls-scroll");
-                      const barEl = document.getElementById("vda-recalls-bar");
-                      const thumbEl = document.getElementById("vda-recalls-thumb");
-
-                      function clamp(v, min, max) {{
-                        return Math.max(min, Math.min(max, v));
-                      }}
-
-                      function updateThumb() {{
-                        const scrollWidth = scrollEl.scrollWidth;
-                        const clientWidth = scrollEl.clientWidth;
-                        const maxScroll = Math.max(0, scrollWidth - clientWidth);
-                        const barWidth = barEl.clientWidth;
-
-                        if (maxScroll <= 0) {{
-                          barEl.style.display = "none";
-                          return;
-                        }}
-                        barEl.style.display = "block";
-
-                        const ratio = clientWidth / scrollWidth;
-                        const thumbWidth = clamp(Math.round(barWidth * ratio), 28, barWidth);
-                        thumbEl.style.width = thumbWidth + "px";
-
-                        const maxThumbX = Math.max(0, barWidth - thumbWidth);
-                        const x = maxScroll ? (scrollEl.scrollLeft / maxScroll) * maxThumbX : 0;
-                        thumbEl.style.transform = `translateX(${{x}}px)`;
-                      }}
-
-                      scrollEl.addEventListener("scroll", updateThumb, {{ passive: true }});
-                      window.addEventListener("resize", updateThumb);
-
-                      let dragging = false;
-                      let dragOffset = 0;
-
-                      thumbEl.addEventListener("pointerdown", (e) => {{
-                        dragging = true;
-                        thumbEl.setPointerCapture(e.pointerId);
-                        dragOffset = e.clientX - thumbEl.getBoundingClientRect().left;
-                      }});
-
-                      thumbEl.addEventListener("pointermove", (e) => {{
-                        if (!dragging) return;
-                        const barRect = barEl.getBoundingClientRect();
-                        const thumbRect = thumbEl.getBoundingClientRect();
-                        const barWidth = barRect.width;
-                        const thumbWidth = thumbRect.width;
-                        const maxThumbX = Math.max(0, barWidth - thumbWidth);
-                        let x = e.clientX - barRect.left - dragOffset;
-                        x = clamp(x, 0, maxThumbX);
-
-                        const maxScroll = Math.max(0, scrollEl.scrollWidth - scrollEl.clientWidth);
-                        scrollEl.scrollLeft = maxThumbX ? (x / maxThumbX) * maxScroll : 0;
-                      }});
-
-                      thumbEl.addEventListener("pointerup", () => {{
-                        dragging = false;
-                      }});
-
-                      barEl.addEventListener("pointerdown", (e) => {{
-                        if (e.target === thumbEl) return;
-                        const barRect = barEl.getBoundingClientRect();
-                        const barWidth = barRect.width;
-                        const thumbWidth = thumbEl.getBoundingClientRect().width;
-                        const maxThumbX = Math.max(0, barWidth - thumbWidth);
-                        let x = e.clientX - barRect.left - thumbWidth / 2;
-                        x = clamp(x, 0, maxThumbX);
-
-                        const maxScroll = Math.max(0, scrollEl.scrollWidth - scrollEl.clientWidth);
-                        scrollEl.scrollLeft = maxThumbX ? (x / maxThumbX) * maxScroll : 0;
-                      }});
-
-                      // Initial layout
-                      updateThumb();
-                      // A second update after layout settles (fonts/table rendering)
-                      setTimeout(updateThumb, 50);
-                    </script>
-                    """,
-                    height=420,
-                    scrolling=False,
-                )
 
-        with st.expander("View complaints (all)"):
-            if complaints_df is None or complaints_df.empty:
-                st.info("No complaints returned by NHTSA.")
-            else:
-                cols = [
-                    c
-                    for c in [
-                        "odiNumber",
-                        "dateComplaintFiled",
-                        "components",
-                        "crash",
-                        "fire",
-                        "numberOfInjuries",
-                        "numberOfDeaths",
-                        "summary",
-                    ]
-                    if c in complaints_df.columns
-                ]
-                st.dataframe(complaints_df[cols], use_container_width=True, hide_index=True)
-
-    # --- Search ---
-    with tabs[1]:
-        st.write("Search within this vehicle's NHTSA complaints by symptom text.")
-        text_col = _best_text_column(complaints_df)
-        if complaints_df.empty:
-            st.info("No complaints for this vehicle.")
+def _summary_tab(recalls_df: pd.DataFrame, complaints_df: pd.DataFrame, comp_df: pd.DataFrame) -> None:
+    left, right = st.columns([1, 1])
+    with left:
+        st.markdown('<div class="vda-section-title">Defect patterns</div>', unsafe_allow_html=True)
+        if comp_df.empty:
+            st.info("No complaint component labels returned for this vehicle.")
         else:
-            query = st.text_input("Symptom query", value="", placeholder="e.g., transmission slipping")
-            top_k = 10
-
-            texts = complaints_df[text_col].fillna("").astype(str).tolist()
-            idx = build_index(texts)
-            matches = search_index(query, idx, top_k=int(top_k)) if query else []
-
-            if query and not matches:
-                st.info("No matches found.")
-            elif query:
-                rows = []
-                for i, score_ in matches:
-                    row = complaints_df.iloc[i].to_dict()
-                    row["_matchScore"] = round(score_, 3)
-                    rows.append(row)
-                out = pd.DataFrame(rows)
-                keep = [
-                    c
-                    for c in [
-                        "_matchScore",
-                        "odiNumber",
-                        "dateComplaintFiled",
-                        "components",
-                        "crash",
-                        "fire",
-                        "numberOfInjuries",
-                        "numberOfDeaths",
-                        "consumerLocation",
-                        text_col,
-                    ]
-                    if c in out.columns
-                ]
-                st.dataframe(out[keep], use_container_width=True, hide_index=True)
+            top_n = comp_df.head(10)
 
-    # --- Map ---
-    with tabs[2]:
-        if "stateAbbreviation" not in complaints_df.columns or complaints_df["stateAbbreviation"].dropna().empty:
-            st.info("No complaint location data available from NHTSA.")
-        else:
-            geo = complaints_df.dropna(subset=["stateAbbreviation"]).copy()
-            counts = geo["stateAbbreviation"].value_counts().rename_axis("state").reset_index(name="count")
-
-            fig = px.choropleth(
-                counts,
-                locations="state",
-                locationmode="USA-states",
-                color="count",
-                scope="usa",
-                title="Complaints by state (from NHTSA consumer location)",
-                color_continuous_scale="Blues",
+            fig = _component_bar_figure(tuple(top_n[["component", "count"]].itertuples(index=False, name=None)))
+            st.plotly_chart(fig, use_container_width=True)
+
+            display_df = pd.DataFrame(
+                {
+                    "Component": top_n["component"],
+                    "Complaint Count": top_n["count"],
+                    "Share of Total Complaints (%)": (top_n["share"] * 100).round(1),
+                }
             )
 
-            fig.update_coloraxes(cmin=0, cmax=counts["count"].max())
-            fig.update_geos(projection_type="albers usa", fitbounds=False)
-            fig.update_layout(height=500, margin=dict(l=10, r=10, t=50, b=10), dragmode=False)
+            st.dataframe(display_df, use_container_width=True, hide_index=True)
 
-            config = {"scrollZoom": False, "displayModeBar": False, "doubleClick": False}
-            st.plotly_chart(fig, use_container_width=True, config=config)
+    with right:
+        st.markdown('<div class="vda-section-title">Recalls</div>', unsafe_allow_html=True)
+        if recalls_df is None or recalls_df.empty:
+            st.info("No recalls returned by NHTSA.")
+        else:
+            cols = [
+                c
+                for c in ["NHTSACampaignNumber", "ReportReceivedDate", "Component", "Summary"]
+                if c in recalls_df.columns
+            ]
 
+            # ReportReceivedDate is already formatted by recalls_to_df.
             st.dataframe(
-                counts.sort_values("count", ascending=False).head(25),
+                recalls_df.head(50)[cols],
                 use_container_width=True,
                 hide_index=True,
+                height=360,
+                column_config={"Summary": st.column_config.TextColumn(width="large")},
             )
 
-    # --- Trends ---
-    with tabs[3]:
-        st.write("Complaint volume over time (by complaint filed date).")
-
-        comp_df = component_frequency(complaints_df)
-        components = ["All components"]
-        if not comp_df.empty:
-            components += comp_df["component"].tolist()
-
-        selected = st.selectbox("Component", components, index=0)
-        df_for_trend = complaints_df
-        if selected != "All components" and "components" in complaints_df.columns:
-            needle = f"|{selected}|"
-            s = "|" + complaints_df["components"].fillna("").astype(str) + "|"
-            df_for_trend = complaints_df[s.str.contains(needle, case=False, regex=False)]
-
-        ts = complaints_time_series(df_for_trend, date_col="dateComplaintFiled")
-        if ts.empty:
-            st.info("No complaint dates available for this selection.")
+    with st.expander("View complaints (all)"):
+        if complaints_df is None or complaints_df.empty:
+            st.info("No complaints returned by NHTSA.")
         else:
-            title = "Complaints per month" if selected == "All components" else f"Complaints per month — {selected}"
-            fig = px.line(ts, x="month", y="count", markers=True, title=title)
-            fig.update_layout(height=380, margin=dict(l=10, r=10, t=50, b=10))
-            st.plotly_chart(fig, use_container_width=True)
-else:
-    st.info(
-        "Lookup by VIN or Make/Model/Year in the sidebar and click **Analyze vehicle**. "
-        "Double click cells to enlarge them."
+            cols = [
+                c
+                for c in [
+                    "odiNumber",
+                    "dateComplaintFiled",
+                    "components",
+                    "crash",
+                    "fire",
+                    "numberOfInjuries",
+                    "numberOfDeaths",
+                    "summary",
+                ]
+                if c in complaints_df.columns
+            ]
+            st.dataframe(complaints_df[cols], use_container_width=True, hide_index=True)
+
+
+# Tabs with their own widgets are fragments: typing a query or picking a component
+# reruns just that tab, not the sidebar, metrics and the other tabs.
+@st.fragment
+def _search_tab(complaints_df: pd.DataFrame) -> None:
+    st.write("Search within this vehicle's NHTSA complaints by symptom text.")
+    text_col = st.session_state["analysis_text_col"]
+    if complaints_df.empty:
+        st.info("No complaints for this vehicle.")
+        return
+
+    query = st.text_input("Symptom query", value="", placeholder="e.g., transmission slipping")
+    if not query:
+        # Nothing to search yet: don't touch (or lazily build) the index.
+        return
+
+    top_k = 10
+
+    if "analysis_search_index" not in st.session_state:
+        st.session_state["analysis_search_index"] = _build_search_index(complaints_df, text_col)
+    idx = st.session_state["analysis_search_index"]
+    # Ranked matches are memoized per query for the current analysis, so a rerun
+    # from another widget doesn't re-vectorize and re-score the same query. Bounded:
+    # only the most recently used SEARCH_RESULTS_MAX queries are kept.
+    results_by_query = st.session_state.setdefault("analysis_search_results", OrderedDict())
+    matches = results_by_query.get(query)
+    if matches is None:
+        matches = search_index(query, idx, top_k=int(top_k)) if idx is not None else []
+        results_by_query[query] = matches
+        while len(results_by_query) > SEARCH_RESULTS_MAX:
+            results_by_query.popitem(last=False)
+    else:
+        results_by_query.move_to_end(query)
+
+    if not matches:
+        st.info("No matches found.")
+        return
+
+    idxs, scores = zip(*matches)
+    keep = [
+        c
+        for c in [
+            "odiNumber",
+            "dateComplaintFiled",
+            "components",
+            "crash",
+            "fire",
+            "numberOfInjuries",
+            "numberOfDeaths",
+            "consumerLocation",
+            text_col,
+        ]
+        if c in complaints_df.columns
+    ]
+    # Gather rows and columns in one step; the selection is already a new frame.
+    out = complaints_df.iloc[list(idxs)][keep]
+    out.insert(0, "_matchScore", np.round(scores, 3))
+    st.dataframe(out, use_container_width=True, hide_index=True)
+
+
+def _map_tab() -> None:
+    counts = st.session_state["analysis_state_counts"]
+    if counts.empty:
+        st.info("No complaint location data available from NHTSA.")
+    else:
+        fig = _state_choropleth_figure(tuple(counts[["state", "count"]].itertuples(index=False, name=None)))
+
+        config = {"scrollZoom": False, "displayModeBar": False, "doubleClick": False}
+        st.plotly_chart(fig, use_container_width=True, config=config)
+
+        st.dataframe(
+            counts.sort_values("count", ascending=False).head(25),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+
+@st.fragment
+def _trends_tab(complaints_df: pd.DataFrame, comp_df: pd.DataFrame) -> None:
+    st.write("Complaint volume over time (by complaint filed date).")
+
+    component_options = ["All components"]
+    if not comp_df.empty:
+        component_options += comp_df["component"].tolist()
+
+    selected = st.selectbox("Component", component_options, index=0)
+    if selected == "All components":
+        ts = st.session_state["analysis_time_series"]
+    else:
+        # Per-component series are memoized for the current analysis, so switching
+        # back to a component already viewed is a dict lookup.
+        ts_by_component = st.session_state.setdefault("analysis_component_ts", {})
+        ts = ts_by_component.get(selected)
+        if ts is None:
+            rows = st.session_state.get("analysis_component_rows", {}).get(selected, [])
+            ts = complaints_time_series(complaints_df.iloc[rows], date_col="dateComplaintFiled")
+            ts_by_component[selected] = ts
+    if ts.empty:
+        st.info("No complaint dates available for this selection.")
+    else:
+        title = "Complaints per month" if selected == "All components" else f"Complaints per month — {selected}"
+        fig = _trend_line_figure(tuple(ts[["month", "count"]].itertuples(index=False, name=None)), title)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# Read-only default for the results readers below, so a rerun doesn't build a
+# throwaway empty frame per lookup. Never mutate it.
+_EMPTY_DF = pd.DataFrame()
+
+
+def _render_results() -> None:
+    # --- Display results if available ---
+    # Back-compat: if older keys exist (from prior session) but new ones don't, reuse them.
+    if ("analysis_vehicle" not in st.session_state) and ("vehicle" in st.session_state):
+        st.session_state["analysis_vehicle"] = st.session_state["vehicle"]
+        st.session_state["analysis_recalls_df"] = st.session_state.get("recalls_df", _EMPTY_DF)
+        st.session_state["analysis_complaints_df"] = st.session_state.get("complaints_df", _EMPTY_DF)
+        st.session_state["analysis_enrich_stats"] = st.session_state.get(
+            "enrich_stats", {"requested": 0, "enriched": 0, "failed": 0, "errors": 0}
+        )
+        st.session_state["analysis_raw_recalls"] = st.session_state.get("raw_recalls", [])
+        st.session_state["analysis_raw_complaints"] = st.session_state.get("raw_complaints", [])
+
+    if "analysis_vehicle" in st.session_state:
+        v = st.session_state["analysis_vehicle"]
+        recalls_df = st.session_state.get("analysis_recalls_df", _EMPTY_DF)
+        complaints_df = st.session_state.get("analysis_complaints_df", _EMPTY_DF)
+        enrich_stats = st.session_state.get(
+            "analysis_enrich_stats", {"requested": 0, "enriched": 0, "failed": 0, "errors": 0}
+        )
+
+        analysis_error = st.session_state.get("analysis_error")
+        analysis_error_details = st.session_state.get("analysis_error_details")
+        if analysis_error:
+            st.error(analysis_error)
+            if analysis_error_details:
+                with st.expander("Details"):
+                    st.code(analysis_error_details)
+            st.stop()
+
+        st.markdown(
+            f"""
+            <div style="font-size:1.4rem; font-weight:600; margin-bottom:0.5rem;">
+                {v['year']} 
+                <span style="color:#6b7280; font-weight:500;">
+                    {v['make']} {v['model']}
+                </span>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+
+        if v.get("vin"):
+            st.caption(f"VIN: `{v['vin']}`")
+
+        # Sessions analyzed before aggregates were stored get them computed once here.
+        if any(k not in st.session_state for k in ANALYSIS_AGGREGATE_KEYS):
+            _store_analysis_aggregates(complaints_df)
+        sev = st.session_state["analysis_severity"]
+        comp_df = st.session_state["analysis_component_freq"]
+        k1, k2, k3, k4, k5, k6 = st.columns(6)
+        k1.metric("Complaints", f"{len(complaints_df):,}")
+        k2.metric("Recalls", f"{len(recalls_df):,}")
+        k3.metric("Crashes", f"{sev['crash']:,}")
+        k4.metric("Fires", f"{sev['fire']:,}")
+        k5.metric("Injuries", f"{sev['injuries']:,}")
+        k6.metric("Deaths", f"{sev['deaths']:,}")
+
+        tabs = st.tabs(["Summary", "Search", "Map", "Trends"])
+
+        with tabs[0]:
+            _summary_tab(recalls_df, complaints_df, comp_df)
+
+        with tabs[1]:
+            _search_tab(complaints_df)
+
+        with tabs[2]:
+            _map_tab()
+
+        with tabs[3]:
+            _trends_tab(complaints_df, comp_df)
+    else:
+        st.info(
+            "Lookup by VIN or Make/Model/Year in the sidebar and click **Analyze vehicle**. "
+            "Double click cells to enlarge them."
+        )
+
+
+def render() -> None:
+    """Render one Streamlit run of the app (page setup, sidebar, analysis, results)."""
+    st.set_page_config(
+        page_title="Vehicle Defect Assessment Tool",
+        layout="wide",
     )
+
+    _render_header()
+
+    input_mode, draft_vin, draft_make, draft_model, draft_year, analyze_clicked = _render_sidebar()
+
+    if analyze_clicked:
+        _run_analysis(input_mode, draft_vin, draft_make, draft_model, draft_year)
+
+    _render_results()
+
+
+if __name__ == "__main__":
+    render()
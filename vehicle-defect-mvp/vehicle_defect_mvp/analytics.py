@@ -1,10 +1,38 @@
 from __future__ import annotations
 
+from collections import Counter
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from .utils import extract_state_abbr, split_components, safe_int
+from .utils import extract_state_abbr, split_components, safe_int, unify_component_separators
+
+
+# dtype for long free-text columns (complaint summary / enriched description).
+TEXT_DTYPE = "string[pyarrow]"
+
+# complaintsByVehicle string fields stored as TEXT_DTYPE by complaints_to_df.
+TEXT_COLUMNS = ("manufacturer", "components", "summary", "productMake", "productModel")
+
+
+def _parse_dates(raw: pd.Series, fmt: str) -> pd.Series:
+    """
+    Parse with the endpoint's known format (vectorized path, no per-row format
+    guessing); values that don't match fall back to per-value inference.
+    """
+    parsed = pd.to_datetime(raw, format=fmt, errors="coerce")
+    missed = parsed.isna() & raw.notna()
+    if missed.any():
+        try:
+            fallback = pd.to_datetime(raw[missed], format="mixed", errors="coerce")
+            if fallback.dt.tz is not None:
+                fallback = fallback.dt.tz_localize(None)
+            parsed[missed] = fallback
+        except (TypeError, ValueError, AttributeError):
+            # e.g. mixed UTC offsets: leave those values as NaT
+            pass
+    return parsed
 
 
 def recalls_to_df(recalls: List[Dict[str, Any]]) -> pd.DataFrame:
@@ -16,6 +44,11 @@ def recalls_to_df(recalls: List[Dict[str, Any]]) -> pd.DataFrame:
     df = pd.DataFrame(recalls).copy()
     # Normalize common fields (API capitalization varies a bit by endpoint)
     # Keep original keys if present.
+    if "ReportReceivedDate" in df.columns:
+        # Display-ready once per fetch instead of re-parsing on every Summary render.
+        # recallsByVehicle sends DD/MM/YYYY; an explicit format also stops pandas from
+        # guessing month-first off the first row.
+        df["ReportReceivedDate"] = _parse_dates(df["ReportReceivedDate"], "%d/%m/%Y").dt.strftime("%m/%d/%Y")
     return df
 
 
@@ -49,11 +82,17 @@ def complaints_to_df(complaints: List[Dict[str, Any]]) -> pd.DataFrame:
             df[col] = df[col].fillna(False).astype(bool)
     for col in ["numberOfInjuries", "numberOfDeaths"]:
         if col in df.columns:
-            df[col] = df[col].fillna(0).astype(int)
+            df[col] = df[col].fillna(0).astype("int32")
     # Parse dates (complaintsByVehicle uses MM/DD/YYYY)
     for col in ["dateOfIncident", "dateComplaintFiled"]:
         if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
+            df[col] = _parse_dates(df[col], "%m/%d/%Y")
+    # Text columns: Arrow-backed strings skip per-cell object boxing when
+    # st.dataframe serializes the frame to Arrow on every rerun (pandas 2 would
+    # otherwise keep them as object columns).
+    text_cols = [c for c in TEXT_COLUMNS if c in df.columns]
+    if text_cols:
+        df[text_cols] = df[text_cols].astype(TEXT_DTYPE)
     return df
 
 
@@ -111,27 +150,70 @@ def component_frequency(complaints_df: pd.DataFrame) -> pd.DataFrame:
     if complaints_df is None or complaints_df.empty:
         return pd.DataFrame(columns=["component", "count", "share"])
 
-    counts = {}
-    for v in complaints_df.get("components", pd.Series(dtype=str)).fillna("").tolist():
-        for comp in split_components(v):
-            counts[comp] = counts.get(comp, 0) + 1
+    # One split over the joined column instead of a split_components call per row;
+    # joining on a separator keeps rows apart exactly as per-row splitting would.
+    values = complaints_df.get("components", pd.Series(dtype=str)).dropna().tolist()
+    # Counter counts the stripped, non-blank, upper-cased parts in C (first-seen order).
+    parts = filter(None, map(str.strip, unify_component_separators(",".join(values)).split(",")))
+    counts = Counter(map(str.upper, parts))
 
     total = sum(counts.values()) or 0
     rows = []
-    for comp, cnt in sorted(counts.items(), key=lambda x: x[1], reverse=True):
+    # most_common() is a stable sort on count, so ties keep first-seen order.
+    for comp, cnt in counts.most_common():
         rows.append({"component": comp, "count": cnt, "share": (cnt / total) if total else 0.0})
     return pd.DataFrame(rows)
 
 
+def component_row_index(complaints_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Map each component (split like component_frequency) to the row positions
+    of the complaints that list it, for O(1) per-component filtering via iloc.
+    """
+    if complaints_df is None or complaints_df.empty or "components" not in complaints_df.columns:
+        return {}
+
+    positions: Dict[str, List[int]] = {}
+    for pos, v in enumerate(complaints_df["components"].fillna("").tolist()):
+        for comp in dict.fromkeys(split_components(v)):
+            positions.setdefault(comp, []).append(pos)
+    return {comp: np.asarray(rows, dtype=np.intp) for comp, rows in positions.items()}
+
+
+SEVERITY_COLUMNS = {
+    "crash": "crash",
+    "fire": "fire",
+    "injuries": "numberOfInjuries",
+    "deaths": "numberOfDeaths",
+}
+
+
 def severity_summary(complaints_df: pd.DataFrame) -> Dict[str, int]:
     if complaints_df is None or complaints_df.empty:
-        return {"crash": 0, "fire": 0, "injuries": 0, "deaths": 0}
-    return {
-        "crash": int(complaints_df.get("crash", False).sum()) if "crash" in complaints_df.columns else 0,
-        "fire": int(complaints_df.get("fire", False).sum()) if "fire" in complaints_df.columns else 0,
-        "injuries": int(complaints_df.get("numberOfInjuries", 0).sum()) if "numberOfInjuries" in complaints_df.columns else 0,
-        "deaths": int(complaints_df.get("numberOfDeaths", 0).sum()) if "numberOfDeaths" in complaints_df.columns else 0,
-    }
+        return {key: 0 for key in SEVERITY_COLUMNS}
+    # One column-wise pass; missing columns count as zero.
+    totals = (
+        complaints_df.reindex(columns=list(SEVERITY_COLUMNS.values()), fill_value=0)
+        .fillna(0)
+        .astype("int32")
+        .sum()
+    )
+    return {key: int(totals[col]) for key, col in SEVERITY_COLUMNS.items()}
+
+
+def state_counts(complaints_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Complaints per state (from enriched consumerLocation): columns [state, count].
+    """
+    if complaints_df is None or complaints_df.empty or "stateAbbreviation" not in complaints_df.columns:
+        return pd.DataFrame(columns=["state", "count"])
+    # Count on the column alone (no frame copy). observed=True skips unused
+    # categories, so no zero-count filter pass is needed afterwards.
+    s = complaints_df["stateAbbreviation"].dropna()
+    counts = s.groupby(s, observed=True, sort=False).size().sort_values(ascending=False, kind="stable")
+    out = counts.rename_axis("state").reset_index(name="count")
+    out["state"] = out["state"].astype(str)
+    return out
 
 
 def complaints_time_series(complaints_df: pd.DataFrame, date_col: str = "dateComplaintFiled") -> pd.DataFrame:
@@ -2,58 +2,253 @@ from __future__ import annotations
 
 import json
 import os
+import secrets
+import threading
 import time
 import hashlib
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, Optional
+
+import orjson
+
+
+# Serialized entries above this size are zlib-compressed on disk (level 1: JSON
+# still shrinks several-fold at a fraction of the cost of higher levels).
+COMPRESS_MIN_BYTES = 4096
+_ZLIB_LEVEL = 1
+
+
+def _write_atomic(path: Path, data: bytes, mtime: Optional[float] = None) -> None:
+    """
+    Write to a sibling temp file and os.replace it into place, so readers (and a
+    crash mid-write) never see a truncated cache file. No fsync: losing a cache
+    entry on power failure only costs a re-fetch. `mtime`, when given, is stamped
+    on the file before it becomes visible.
+    """
+    tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}.{secrets.token_hex(4)}")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _unlink_quiet(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _usable_cpus() -> int:
+    # CPUs this process may run on (affinity/cgroup-pinned containers), not the host total.
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _parse_document(doc: bytes) -> Any:
+    """Parse a (decompressed) cache document."""
+    try:
+        return orjson.loads(doc)
+    except orjson.JSONDecodeError:
+        # Older files written by the stdlib encoder may hold NaN/Infinity.
+        return json.loads(doc)
+
+
+def _load_file(path: Path) -> bytes:
+    """Read a cache file and return its JSON document bytes (decompressed)."""
+    raw = path.read_bytes()
+    # A zlib stream always starts with 0x78; JSON text never does.
+    if raw[:1] == b"\x78":
+        return zlib.decompress(raw)
+    return raw
+
+
+@lru_cache(maxsize=2048)
+def _key_digest(key: str) -> str:
+    # Only needs to be filename-safe and collision-free, not cryptographic.
+    # Memoized because a read-through (get miss, then set) hashes the same key
+    # twice; the digest is deterministic, so sharing it across instances is safe.
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
 
 
 @dataclass
 class CacheEntry:
-    value: Any
+    # The entry's JSON document exactly as stored on disk (decompressed), so a
+    # memory hit decodes to the same value a file read would, as a fresh object.
+    document: bytes
     fetched_at: float
 
 
 class DiskCache:
     """
-    Minimal file-based JSON cache with TTL support.
+    Minimal file-based JSON cache with TTL support (large entries are stored
+    zlib-compressed).
 
-    Keys are hashed to filenames to avoid path issues.
+    Keys are hashed to filenames to avoid path issues. Recently used entries are
+    also kept (serialized) in an in-memory LRU bounded by entry count and total
+    document bytes, so hot keys skip the stat, file read and decompression; every
+    get still returns a freshly parsed value. Documents larger than 1/16 of the
+    byte budget (e.g. multi-MB complaint lists) are served from disk only.
     """
 
-    def __init__(self, base_dir: str | Path = ".cache", default_ttl_seconds: int = 24 * 3600):
+    def __init__(
+        self,
+        base_dir: str | Path = ".cache",
+        default_ttl_seconds: int = 24 * 3600,
+        memory_max_entries: int = 1024,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+    ):
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.default_ttl_seconds = int(default_ttl_seconds)
+        self.memory_max_entries = int(memory_max_entries)
+        self.memory_max_bytes = int(memory_max_bytes)
+        self._mem: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._mem_bytes = 0
+        # Shared by the enrichment worker threads.
+        self._mem_lock = threading.Lock()
+
+    def _remember(self, entries: Iterable[tuple[str, CacheEntry]]) -> None:
+        if self.memory_max_entries <= 0 or self.memory_max_bytes <= 0:
+            return
+        entry_limit = self.memory_max_bytes // 16
+        with self._mem_lock:
+            for key, entry in entries:
+                old = self._mem.pop(key, None)
+                if old is not None:
+                    self._mem_bytes -= len(old.document)
+                if len(entry.document) > entry_limit:
+                    continue
+                self._mem[key] = entry
+                self._mem_bytes += len(entry.document)
+            while len(self._mem) > self.memory_max_entries or self._mem_bytes > self.memory_max_bytes:
+                _, evicted = self._mem.popitem(last=False)
+                self._mem_bytes -= len(evicted.document)
 
     def _path_for_key(self, key: str) -> Path:
-        h = hashlib.sha256(key.encode("utf-8")).hexdigest()
-        return self.base_dir / f"{h}.json"
+        # Sharded by the first two hex chars (256 subdirectories) so no single
+        # directory grows to the full entry count.
+        h = _key_digest(key)
+        return self.base_dir / h[:2] / f"{h[2:]}.json"
+
+    def _legacy_paths_for_key(self, key: str) -> tuple[Path, ...]:
+        # Earlier flat layouts: BLAKE2b-named, and SHA-256-named before that.
+        blake = _key_digest(key)
+        sha = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return (self.base_dir / f"{blake}.json", self.base_dir / f"{sha}.json")
+
+    def _migrate_legacy(self, key: str, path: Path) -> bool:
+        """Move a file cached under an older name/layout to `path`; True if one existed."""
+        for legacy in self._legacy_paths_for_key(key):
+            if not legacy.exists():
+                continue
+            try:
+                path.parent.mkdir(exist_ok=True)
+                os.replace(legacy, path)
+                return True
+            except OSError:
+                return False
+        return False
 
     def get(self, key: str, ttl_seconds: Optional[int] = None) -> Optional[Any]:
         ttl = self.default_ttl_seconds if ttl_seconds is None else int(ttl_seconds)
+        with self._mem_lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+        if entry is not None:
+            # Same fetch time as the file on disk, so an expired hit is a miss.
+            if ttl >= 0 and (time.time() - entry.fetched_at) > ttl:
+                return None
+            return _parse_document(entry.document).get("data")
+
         path = self._path_for_key(key)
-        if not path.exists():
+        try:
+            st = path.stat()
+        except OSError:
+            if not self._migrate_legacy(key, path):
+                return None
+            try:
+                st = path.stat()
+            except OSError:
+                return None
+        # The file's mtime is its fetch time (set() stamps it), so an expired entry
+        # is rejected from the stat alone, without reading or parsing it.
+        if ttl >= 0 and (time.time() - st.st_mtime) > ttl:
             return None
         try:
-            payload = json.loads(path.read_text(encoding="utf-8"))
+            document = _load_file(path)
+            payload = _parse_document(document)
+            # Still authoritative: a copied/restored cache dir can carry newer mtimes.
             fetched_at = float(payload.get("_fetched_at", 0))
             if ttl >= 0 and (time.time() - fetched_at) > ttl:
                 return None
-            return payload.get("data")
+            value = payload.get("data")
         except Exception:
             # Corrupt cache; ignore.
             return None
+        self._remember([(key, CacheEntry(document=document, fetched_at=fetched_at))])
+        return value
+
+    def get_many(self, keys: Iterable[str], ttl_seconds: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Bulk lookup: returns {key: value} for the keys that are cached and fresh.
+        Missing/expired keys are simply absent from the result.
+        """
+        out: Dict[str, Any] = {}
+        for key in keys:
+            value = self.get(key, ttl_seconds=ttl_seconds)
+            if value is not None:
+                out[key] = value
+        return out
 
     def set(self, key: str, value: Any) -> None:
-        path = self._path_for_key(key)
-        payload = {"_fetched_at": time.time(), "data": value}
-        path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        """
+        Bulk store, the counterpart of get_many: every entry gets the same fetch
+        time and the in-memory LRU is updated under one lock acquisition.
+        """
+        fetched_at = time.time()
+        entries = []
+        for key, value in items.items():
+            payload = {"_fetched_at": fetched_at, "data": value}
+            path = self._path_for_key(key)
+            path.parent.mkdir(exist_ok=True)
+            document = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+            data = zlib.compress(document, _ZLIB_LEVEL) if len(document) > COMPRESS_MIN_BYTES else document
+            _write_atomic(path, data, mtime=fetched_at)
+            # Remember what was written, not `value`: a later hit must match a disk read.
+            entries.append((key, CacheEntry(document=document, fetched_at=fetched_at)))
+        self._remember(entries)
 
     def clear(self) -> None:
-        for p in self.base_dir.glob("*.json"):
-            try:
-                p.unlink()
-            except Exception:
+        with self._mem_lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+        # Shard directories plus any files left in older flat layouts.
+        paths = [os.fspath(p) for p in self.base_dir.rglob("*.json")]
+        if len(paths) < 64:
+            for p in paths:
+                _unlink_quiet(p)
+            return
+        # Unlinks are independent and block in the filesystem, so overlap them.
+        with ThreadPoolExecutor(max_workers=min(32, _usable_cpus() * 4)) as ex:
+            for _ in ex.map(_unlink_quiet, paths):
                 pass
@@ -1,13 +1,48 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import Any, Dict, Optional, Tuple
 
 import pandas as pd
+import requests
 
 from .cache import DiskCache
-from .nhtsa import fetch_safety_issue_by_nhtsa_id
-from .analytics import enrich_complaint_from_safety_issue
+from .nhtsa import SAFETY_ISSUE_TTL_SECONDS, fetch_safety_issue_by_nhtsa_id, safety_issue_url
+from .analytics import TEXT_DTYPE, enrich_complaint_from_safety_issue
+
+
+# In-flight lookups shared across callers (e.g. two sessions analyzing the same
+# vehicle): concurrent requests for one ODI number wait on a single fetch.
+_inflight: Dict[int, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _fetch_complaint_payload(
+    odi: int,
+    cache: Optional[DiskCache],
+    session: Optional[requests.Session],
+) -> Dict[str, Any]:
+    with _inflight_lock:
+        fut = _inflight.get(odi)
+        owner = fut is None
+        if owner:
+            fut = Future()
+            _inflight[odi] = fut
+
+    if not owner:
+        return fut.result()
+
+    try:
+        payload = fetch_safety_issue_by_nhtsa_id(odi, issue_type="complaints", cache=cache, session=session)
+        fut.set_result(payload)
+        return payload
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(odi, None)
 
 
 def enrich_complaints_df(
@@ -15,6 +50,7 @@ def enrich_complaints_df(
     cache: Optional[DiskCache],
     max_records: int = 150,
     max_workers: int = 6,
+    session: Optional[requests.Session] = None,
 ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
     Enrich a complaints dataframe with additional fields from /safetyIssues/byNhtsaId:
@@ -23,49 +59,88 @@ def enrich_complaints_df(
       - structured components
       - ISO dates
 
-    Returns (enriched_df, stats)
+    Pass a shared `session` so the worker threads reuse pooled connections.
+
+    Returns (enriched_df, stats). stats["failed"] counts every record that wasn't
+    enriched; stats["errors"] only the lookups that raised (network/HTTP errors),
+    as opposed to an empty (cached) payload, so callers can tell what a retry could fix.
     """
     if complaints_df is None or complaints_df.empty or "odiNumber" not in complaints_df.columns:
-        return complaints_df, {"requested": 0, "enriched": 0, "failed": 0}
+        return complaints_df, {"requested": 0, "enriched": 0, "failed": 0, "errors": 0}
 
-    df = complaints_df.copy()
+    df = complaints_df
     odi_numbers = [x for x in df["odiNumber"].dropna().astype(int).tolist()]
     odi_numbers = odi_numbers[: max(0, int(max_records))]
 
     results = {}
     failed = 0
+    errors = 0
 
-    def _fetch_one(odi: int) -> Dict[str, Any]:
-        payload = fetch_safety_issue_by_nhtsa_id(odi, issue_type="complaints", cache=cache)
-        return enrich_complaint_from_safety_issue(payload)
+    def _collect(odi: int, row: Dict[str, Any]) -> None:
+        nonlocal failed
+        if row:
+            results[int(odi)] = row
+        else:
+            failed += 1
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs = {ex.submit(_fetch_one, odi): odi for odi in odi_numbers}
-        for fut in as_completed(futs):
-            odi = futs[fut]
+    # Warm cache: resolve hits up front and only hand misses to the thread pool
+    # (no executor at all when every record is already cached).
+    misses = odi_numbers
+    if cache is not None:
+        urls = {odi: safety_issue_url(odi, "complaints") for odi in odi_numbers}
+        cached = cache.get_many(urls.values(), ttl_seconds=SAFETY_ISSUE_TTL_SECONDS)
+        misses = []
+        for odi in odi_numbers:
+            payload = cached.get(urls[odi])
+            if payload is None:
+                misses.append(odi)
+                continue
             try:
-                row = fut.result()
-                if row:
-                    results[int(odi)] = row
-                else:
-                    failed += 1
+                _collect(odi, enrich_complaint_from_safety_issue(payload))
             except Exception:
                 failed += 1
 
-    # Merge back
+    def _fetch_one(odi: int) -> Dict[str, Any]:
+        payload = _fetch_complaint_payload(odi, cache, session)
+        return enrich_complaint_from_safety_issue(payload)
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            futs = {ex.submit(_fetch_one, odi): odi for odi in misses}
+            for fut in as_completed(futs):
+                odi = futs[fut]
+                try:
+                    _collect(odi, fut.result())
+                except Exception:
+                    failed += 1
+                    errors += 1
+
+    # Attach enriched fields as new columns (no copy/merge of the original frame):
+    # align the enriched rows to complaints_df by ODI number; rows that weren't
+    # enriched (e.g. past max_records) get NaN.
     if results:
-        enrich_rows = pd.DataFrame(list(results.values()))
+        enrich_rows = pd.DataFrame(list(results.values()), index=list(results.keys()))
+        enrich_rows = enrich_rows.drop(columns=["odiNumber"], errors="ignore")
+        keys = pd.to_numeric(df["odiNumber"], errors="coerce")
+        aligned = enrich_rows.reindex(keys.to_numpy())
+        aligned.index = df.index
         # Avoid duplicate columns; suffix enriched ones
-        df = df.merge(enrich_rows, how="left", on="odiNumber", suffixes=("", "_enriched"))
+        df = df.assign(**{
+            (f"{col}_enriched" if col in df.columns else col): aligned[col] for col in aligned.columns
+        })
 
-        # Parse ISO dates if present
+        # Parse ISO dates if present (format="ISO8601" skips per-row format inference)
         if "dateFiled_iso" in df.columns:
-            df["dateFiled_iso"] = pd.to_datetime(df["dateFiled_iso"], errors="coerce")
+            df["dateFiled_iso"] = pd.to_datetime(df["dateFiled_iso"], format="ISO8601", errors="coerce")
         if "dateOfIncident_iso" in df.columns:
-            df["dateOfIncident_iso"] = pd.to_datetime(df["dateOfIncident_iso"], errors="coerce")
+            df["dateOfIncident_iso"] = pd.to_datetime(df["dateOfIncident_iso"], format="ISO8601", errors="coerce")
+
+        if "description" in df.columns:
+            df["description"] = df["description"].astype(TEXT_DTYPE)
 
-        # If missing consumerLocation/stateAbbreviation, keep as is
+        # Few distinct states: categorical codes make value_counts/groupby cheap.
+        # Missing consumerLocation/stateAbbreviation stays NaN.
         if "stateAbbreviation" in df.columns:
-            pass
+            df["stateAbbreviation"] = df["stateAbbreviation"].astype("category")
 
-    return df, {"requested": len(odi_numbers), "enriched": len(results), "failed": failed}
+    return df, {"requested": len(odi_numbers), "enriched": len(results), "failed": failed, "errors": errors}
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 from urllib.parse import quote_plus
 
+import orjson
 import requests
 from requests import HTTPError
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
@@ -32,13 +33,15 @@ def _clean_make_model(s: str) -> str:
     wait=wait_exponential(multiplier=0.6, min=0.6, max=6),
     reraise=True,
 )
-def _http_get_json(url: str, timeout: int = 20) -> Any:
+def _http_get_json(url: str, timeout: int = 20, session: Optional[requests.Session] = None) -> Any:
     headers = {
         "User-Agent": "vehicle-defect-mvp/1.0",
         "Accept": "application/json",
     }
 
-    resp = requests.get(url, timeout=timeout, headers=headers)
+    # A shared Session keeps connections alive across calls (no TCP/TLS handshake per request).
+    http = session if session is not None else requests
+    resp = http.get(url, timeout=timeout, headers=headers)
 
     # Treat 404 as empty dataset instead of hard failure
     if resp.status_code == 404:
@@ -50,6 +53,12 @@ def _http_get_json(url: str, timeout: int = 20) -> Any:
 
     resp.raise_for_status()
 
+    # orjson decodes the raw bytes directly (no str round trip); the stdlib parser is
+    # only a fallback for the odd payload orjson rejects (e.g. bare NaN literals).
+    try:
+        return orjson.loads(resp.content)
+    except orjson.JSONDecodeError:
+        pass
     try:
         return resp.json()
     except Exception as e:
@@ -61,6 +70,7 @@ def get_json(
     cache: Optional[DiskCache] = None,
     ttl_seconds: int = 24 * 3600,
     timeout: int = 20,
+    session: Optional[requests.Session] = None,
 ) -> Any:
     if cache is not None:
         cached = cache.get(url, ttl_seconds=ttl_seconds)
@@ -68,7 +78,7 @@ def get_json(
             return cached
 
     try:
-        data = _http_get_json(url, timeout=timeout)
+        data = _http_get_json(url, timeout=timeout, session=session)
     except HTTPError as e:
         raise NHTSAError(f"NHTSA request failed after retries.\nURL: {url}\n{e}") from e
     except requests.RequestException as e:
@@ -80,15 +90,21 @@ def get_json(
     return data
 
 
-def decode_vin(vin: str, cache: Optional[DiskCache] = None) -> Dict[str, Any]:
+def decode_vin(
+    vin: str,
+    cache: Optional[DiskCache] = None,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, Any]:
     vin = (vin or "").strip().upper()
     if not vin:
         raise NHTSAError("VIN is required.")
     if len(vin) != 17:
         raise NHTSAError("VIN must be 17 characters.")
 
-    url = f"https://vpic.nhtsa.dot.gov/api/vehicles/decodevinvalues/{quote_plus(vin)}?format=json"
-    payload = get_json(url, cache=cache, ttl_seconds=7 * 24 * 3600)
+    # Real VINs are ASCII alphanumerics (URL-safe as-is); only quote anything else.
+    vin_q = vin if vin.isascii() and vin.isalnum() else quote_plus(vin)
+    url = f"https://vpic.nhtsa.dot.gov/api/vehicles/decodevinvalues/{vin_q}?format=json"
+    payload = get_json(url, cache=cache, ttl_seconds=7 * 24 * 3600, session=session)
 
     results = payload.get("Results") or []
     if not results:
@@ -109,6 +125,7 @@ def fetch_recalls_by_vehicle(
     model: str,
     year: int,
     cache: Optional[DiskCache] = None,
+    session: Optional[requests.Session] = None,
 ) -> List[Dict[str, Any]]:
     make = _clean_make_model(make)
     model = _clean_make_model(model)
@@ -118,13 +135,14 @@ def fetch_recalls_by_vehicle(
         f"?make={quote_plus(make)}&model={quote_plus(model)}&modelYear={int(year)}"
     )
 
-    payload = get_json(url, cache=cache, ttl_seconds=12 * 3600)
+    payload = get_json(url, cache=cache, ttl_seconds=12 * 3600, session=session)
     return payload.get("results") or payload.get("Results") or []
 
 
 def fetch_recalls_by_campaign(
     campaign_number: str,
     cache: Optional[DiskCache] = None,
+    session: Optional[requests.Session] = None,
 ) -> List[Dict[str, Any]]:
     campaign_number = (campaign_number or "").strip()
     if not campaign_number:
@@ -135,7 +153,7 @@ def fetch_recalls_by_campaign(
         f"?campaignNumber={quote_plus(campaign_number)}"
     )
 
-    payload = get_json(url, cache=cache, ttl_seconds=24 * 3600)
+    payload = get_json(url, cache=cache, ttl_seconds=24 * 3600, session=session)
     return payload.get("results") or payload.get("Results") or []
 
 
@@ -144,6 +162,7 @@ def fetch_complaints_by_vehicle(
     model: str,
     year: int,
     cache: Optional[DiskCache] = None,
+    session: Optional[requests.Session] = None,
 ) -> List[Dict[str, Any]]:
     make = _clean_make_model(make)
     model = _clean_make_model(model)
@@ -153,16 +172,15 @@ def fetch_complaints_by_vehicle(
         f"?make={quote_plus(make)}&model={quote_plus(model)}&modelYear={int(year)}"
     )
 
-    payload = get_json(url, cache=cache, ttl_seconds=12 * 3600)
+    payload = get_json(url, cache=cache, ttl_seconds=12 * 3600, session=session)
     return payload.get("results") or payload.get("Results") or []
 
 
-def fetch_safety_issue_by_nhtsa_id(
-    nhtsa_id: str | int,
-    issue_type: str,
-    cache: Optional[DiskCache] = None,
-) -> Dict[str, Any]:
+SAFETY_ISSUE_TTL_SECONDS = 7 * 24 * 3600
 
+
+def safety_issue_url(nhtsa_id: str | int, issue_type: str) -> str:
+    """URL (and DiskCache key) for a /safetyIssues/byNhtsaId lookup."""
     issue_type = (issue_type or "").strip().lower()
     if issue_type not in {"complaints", "recalls", "investigations"}:
         raise NHTSAError(f"Unsupported issue_type: {issue_type}")
@@ -171,10 +189,18 @@ def fetch_safety_issue_by_nhtsa_id(
     if not nhtsa_id_str:
         raise NHTSAError("nhtsa_id is required")
 
-    url = (
+    return (
         "https://api.nhtsa.gov/safetyIssues/byNhtsaId"
         f"?filter=issueType&filterValue={quote_plus(issue_type)}"
         f"&nhtsaId={quote_plus(nhtsa_id_str)}"
     )
 
-    return get_json(url, cache=cache, ttl_seconds=7 * 24 * 3600)
+
+def fetch_safety_issue_by_nhtsa_id(
+    nhtsa_id: str | int,
+    issue_type: str,
+    cache: Optional[DiskCache] = None,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, Any]:
+    url = safety_issue_url(nhtsa_id, issue_type)
+    return get_json(url, cache=cache, ttl_seconds=SAFETY_ISSUE_TTL_SECONDS, session=session)
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Sequence, Tuple
 
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
 
 @dataclass
@@ -15,7 +16,12 @@ class SearchIndex:
     texts: List[str]
 
 
-def build_index(texts: List[str]) -> SearchIndex:
+def build_index(texts: Sequence[str]) -> SearchIndex:
+    # Accepts any sequence (list or numpy object array) of str/None.
+    # scikit-learn is imported here, not at module load: it is the slowest import
+    # in the app and only needed once there is something to index.
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     cleaned = [(t or "") for t in texts]
     vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), min_df=1, max_df=0.98)
     matrix = vectorizer.fit_transform(cleaned)
@@ -27,10 +33,24 @@ def search(query: str, index: SearchIndex, top_k: int = 10) -> List[Tuple[int, f
     if not q:
         return []
     q_vec = index.vectorizer.transform([q])
-    sims = cosine_similarity(q_vec, index.matrix).ravel()
+    if q_vec.nnz == 0:
+        # No in-vocabulary terms: every score would be 0, skip the matrix product.
+        return []
+    # TF-IDF rows (and the query) are already L2-normalized, so cosine similarity is
+    # a plain sparse dot product; no need to re-normalize the whole matrix per query.
+    sims = (index.matrix @ q_vec.T).toarray().ravel()
     if sims.size == 0:
         return []
     top_k = min(int(top_k), sims.size)
-    idxs = np.argpartition(-sims, range(top_k))[:top_k]
-    pairs = sorted(((int(i), float(sims[i])) for i in idxs), key=lambda x: x[1], reverse=True)
-    return pairs
+    if top_k <= 0:
+        return []
+    # Single-pivot partition finds the k-th best score; only the k hits get sorted.
+    # Ties (common with short, duplicated complaint texts) break by row position: the
+    # partition's own order of equal scores is arbitrary, so rows tied at the cutoff
+    # are chosen lowest-position first rather than taken from the partition.
+    cutoff = sims[np.argpartition(sims, sims.size - top_k)[sims.size - top_k]]
+    above = np.flatnonzero(sims > cutoff)
+    tied = np.flatnonzero(sims == cutoff)[: top_k - above.size]
+    idxs = np.concatenate([above, tied])
+    order = np.lexsort((idxs, -sims[idxs]))
+    return [(int(idxs[j]), float(sims[idxs[j]])) for j in order]
@@ -15,14 +15,28 @@ def extract_state_abbr(consumer_location: Optional[str]) -> Optional[str]:
     if not consumer_location:
         return None
     s = consumer_location.strip()
-    if not s or s.lower() == "unknown":
+    if not s or (len(s) == 7 and s.lower() == "unknown"):
         return None
+    # Common shape "CITY, XX": read the suffix by index instead of uppercasing the
+    # whole string for the regex.
+    if len(s) >= 4 and s[-4] == "," and s[-3] == " ":
+        ab = s[-2:]
+        if ab.isascii() and ab.isalpha():
+            return ab.upper()
     m = STATE_RE.search(s.upper())
     if not m:
         return None
     return m.group(1)
 
 
+def unify_component_separators(components: str) -> str:
+    """
+    Rewrite the "|" and "/" component separators as ",", so a plain
+    str.split(",") splits on all three (runs of separators leave empty parts).
+    """
+    return components.replace("|", ",").replace("/", ",")
+
+
 def split_components(components: Optional[str]) -> list[str]:
     """
     Split components string like "ENGINE,POWER TRAIN" or "SERVICE BRAKES, AIR"
@@ -30,7 +44,7 @@ def split_components(components: Optional[str]) -> list[str]:
     """
     if not components:
         return []
-    parts = re.split(r"[,\|/]+", components)
+    parts = unify_component_separators(components).split(",")
     out = []
     for p in parts:
         p = p.strip()
@@ -41,6 +55,12 @@ def split_components(components: Optional[str]) -> list[str]:
 
 
 def safe_int(x, default: int = 0) -> int:
+    # JSON counts are already ints (exact type check: bools still go through int());
+    # null counts skip the raise/catch.
+    if type(x) is int:
+        return x
+    if x is None:
+        return default
     try:
         return int(x)
     except Exception: